@@ -15,6 +15,11 @@ from .measures import (
     degree_sequence_exponents,
     strength_sequence_power_law_exponent,
     strength_sequence_exponents,
+    fit_power_law,
+    fit_power_laws,
+    graph_fingerprint,
+    MeasureCache,
+    cached_measure,
     degree_distribution
 )
 from .plot import (
@@ -24,4 +29,25 @@ from .plot import (
     plot_line,
     plot_means_and_stdevs,
     scatter_seq
+)
+from .power_law import (
+    PowerLawFit,
+    fit_power_law_mle,
+    power_law_p_value,
+    degree_sequence_power_law_fit,
+    strength_sequence_power_law_fit
+)
+from .ensemble import (
+    NullModelEnsemble,
+    EnsembleSummary,
+    RunningStatistics,
+    QuantileSketch
+)
+from .clustering import (
+    intra_cluster_fractions,
+    intra_fractions_from_labels
+)
+from .sweep import (
+    ThresholdSweep,
+    sweep
 )
\ No newline at end of file
@@ -0,0 +1,60 @@
+from typing import Dict, List, Union
+
+import networkx as nx
+import numpy    as np
+
+from backbones import BackboneResult
+from common import Clustering, ClusteringSet
+
+from .sweep import ThresholdSweep
+
+def intra_cluster_fractions(
+    backbone:    Union[nx.Graph, BackboneResult],
+    clusterings: Union[ClusteringSet, Dict[str, Clustering], List[Clustering]],
+    ps:          List[float],
+    attribute:   str = "p"
+) -> np.ndarray:
+    """
+    Compute the fraction of the edges scoring below each threshold whose
+    endpoints are in the same cluster, for every clustering at once, as a
+    (clusterings, thresholds) array. Thresholds that leave no edges give
+    nan, and no clusterings give an empty array.
+
+    Each clustering is encoded as a label array over the vertices, so which
+    edges are intra-cluster is found for every clustering in one array
+    operation, and the counts at every threshold are prefix sums over the
+    edges sorted by score.
+    """
+    sweep = ThresholdSweep(backbone, ps, attribute)
+
+    if isinstance(clusterings, ClusteringSet):
+        labels = clusterings.labels_for(sweep.nodes)
+    else:
+        if isinstance(clusterings, dict):
+            clusterings = list(clusterings.values())
+
+        # With no clusterings there is nothing to stack, and the result is
+        # an empty (0, thresholds) array.
+        if len(clusterings) == 0:
+            labels = np.empty((0, sweep.n), dtype = np.int64)
+        else:
+            labels = np.stack([c.labels(sweep.nodes) for c in clusterings]).reshape(len(clusterings), sweep.n)
+
+    return intra_fractions_from_labels(labels, sweep)
+
+def intra_fractions_from_labels(labels: np.ndarray, sweep: ThresholdSweep) -> np.ndarray:
+    """
+    The intra-cluster edge fractions of a sweep for a (clusterings, vertices)
+    matrix of cluster labels aligned to the sweep's vertices, where -1 marks
+    a vertex that isn't in a clustering.
+    """
+    source_labels = labels[:, sweep.sources]
+    intra         = (source_labels >= 0) & (source_labels == labels[:, sweep.targets])
+
+    cumulative = np.zeros((intra.shape[0], intra.shape[1] + 1), dtype = np.int64)
+    np.cumsum(intra, axis = 1, out = cumulative[:, 1:])
+
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        fractions = cumulative[:, sweep.counts] / sweep.counts
+
+    return np.where(sweep.counts > 0, fractions, np.nan)
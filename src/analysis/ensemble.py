@@ -0,0 +1,286 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import networkx as nx
+import numpy    as np
+
+from backbones import BackboneStrategy
+from data import RandomGeneticDataProvider
+
+from .measures import fit_power_laws
+from .sweep import ThresholdSweep
+
+"""
+Run a backbone strategy over an ensemble of null model graphs, summarising
+each measure at every threshold without keeping the graphs around.
+"""
+
+# The per-threshold measures an ensemble can summarise, computed from the
+# ThresholdSweep of each replicate's backbone.
+ENSEMBLE_MEASURES: Dict[str, Callable[[ThresholdSweep], np.ndarray]] = {
+    "size":                lambda sweep: sweep.size(),
+    "order":               lambda sweep: sweep.order(),
+    "total_strength":      lambda sweep: sweep.total_strength(),
+    "average_strength":    lambda sweep: sweep.average_strength(),
+    "average_degree":      lambda sweep: sweep.average_degree(),
+    "average_edge_weight": lambda sweep: sweep.average_edge_weight(),
+    "degree_exponent":     lambda sweep: fit_power_laws(sweep.degree_sequences())[0],
+    "strength_exponent":   lambda sweep: fit_power_laws(sweep.strength_sequences())[0]
+}
+
+class RunningStatistics():
+    """
+    The running mean and variance of a stream of equally sized vectors,
+    kept entry by entry with Welford's algorithm. nan entries, such as
+    exponents that couldn't be fitted, are skipped, so each entry has its
+    own count.
+    """
+
+    def __init__(self, size: int) -> RunningStatistics:
+        self.count = np.zeros(size, dtype = np.int64)
+        self._mean = np.zeros(size)
+        self._m2   = np.zeros(size)
+
+    def add(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype = np.float64)
+        valid  = ~np.isnan(values)
+        values = np.where(valid, values, 0)
+
+        self.count += valid
+        delta       = np.where(valid, values - self._mean, 0)
+        self._mean += np.where(valid, delta / np.maximum(self.count, 1), 0)
+        self._m2   += delta * np.where(valid, values - self._mean, 0)
+
+    def merge(self, other: RunningStatistics) -> None:
+        """
+        Combine another accumulator into this one, as if every vector added
+        to it had been added here.
+        """
+        count = self.count + other.count
+        delta = other._mean - self._mean
+
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            self._mean = np.where(count > 0, self._mean + delta * other.count / count, 0)
+            self._m2   = np.where(count > 0, self._m2 + other._m2 + delta ** 2 * self.count * other.count / count, 0)
+
+        self.count = count
+
+    def mean(self) -> np.ndarray:
+        return np.where(self.count > 0, self._mean, np.nan)
+
+    def variance(self) -> np.ndarray:
+        """
+        The sample variance of every entry, or nan for entries with fewer
+        than two values.
+        """
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            return np.where(self.count > 1, self._m2 / (self.count - 1), np.nan)
+
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.variance())
+
+class QuantileSketch():
+    """
+    A mergeable sketch of the distribution of every entry of a stream of
+    equally sized vectors, in the style of the KLL sketch.
+
+    Vectors are buffered in levels, where each vector at level h stands for
+    2^h of the originals. Once a level holds capacity vectors, every entry
+    is sorted and every other value is promoted to the next level, so memory
+    stays at O(capacity log(N / capacity)) and quantiles are exact until
+    more than capacity vectors have been added. Compaction is deterministic,
+    so the same stream always gives the same sketch.
+    """
+
+    def __init__(self, size: int, capacity: int = 128) -> QuantileSketch:
+        self.size     = size
+        self.capacity = capacity
+        self.levels:   List[np.ndarray] = []
+        self._offsets: List[int]        = []
+
+    def add(self, values: np.ndarray) -> None:
+        self._push(0, np.asarray(values, dtype = np.float64)[None, :])
+
+    def merge(self, other: QuantileSketch) -> None:
+        for (level, values) in enumerate(other.levels):
+            if len(values) > 0:
+                self._push(level, values)
+
+    def _push(self, level: int, values: np.ndarray) -> None:
+        while len(self.levels) <= level:
+            self.levels.append(np.empty((0, self.size)))
+            self._offsets.append(0)
+
+        self.levels[level] = np.concatenate([self.levels[level], values])
+
+        if len(self.levels[level]) >= self.capacity:
+            # Sorting puts nan entries last, where they are halved along
+            # with everything else.
+            compacted = np.sort(self.levels[level], axis = 0)
+
+            # Alternate which half is kept so that compaction is unbiased
+            # on average.
+            offset = self._offsets[level]
+            self._offsets[level] = 1 - offset
+
+            keep = len(compacted) // 2 * 2
+            self.levels[level] = compacted[keep:]
+            self._push(level + 1, compacted[offset:keep:2])
+
+    def quantiles(self, qs: List[float]) -> np.ndarray:
+        """
+        Estimate the given quantiles of every entry, as a (len(qs), size)
+        array, ignoring nan values.
+        """
+        values  = np.concatenate(self.levels) if self.levels else np.empty((0, self.size))
+        weights = np.concatenate([np.full(len(l), 2.0 ** h) for (h, l) in enumerate(self.levels)] + [np.empty(0)])
+
+        order      = np.argsort(values, axis = 0, kind = "stable")
+        values     = np.take_along_axis(values, order, axis = 0)
+        weights    = np.where(np.isnan(values), 0, weights[order])
+        cumulative = np.cumsum(weights, axis = 0)
+
+        result = np.full((len(qs), self.size), np.nan)
+        if len(values) == 0:
+            return result
+
+        total = cumulative[-1]
+        for (i, q) in enumerate(qs):
+            rank    = np.sum(cumulative < q * total[None, :], axis = 0)
+            columns = np.flatnonzero((total > 0) & (rank < len(values)))
+            result[i, columns] = values[rank[columns], columns]
+
+        return result
+
+class EnsembleSummary():
+    """
+    The running statistics and quantile sketch of each measure of an
+    ensemble, at every threshold in ps.
+    """
+
+    def __init__(self, ps: np.ndarray, measures: List[str], sketch_capacity: int) -> EnsembleSummary:
+        self.ps         = ps
+        self.replicates = 0
+        self.statistics = {m: RunningStatistics(len(ps)) for m in measures}
+        self.sketches   = {m: QuantileSketch(len(ps), sketch_capacity) for m in measures}
+
+    def add(self, values: Dict[str, np.ndarray]) -> None:
+        self.replicates += 1
+
+        for (measure, v) in values.items():
+            self.statistics[measure].add(v)
+            self.sketches[measure].add(v)
+
+    def merge(self, other: EnsembleSummary) -> None:
+        self.replicates += other.replicates
+
+        for measure in self.statistics:
+            self.statistics[measure].merge(other.statistics[measure])
+            self.sketches[measure].merge(other.sketches[measure])
+
+    def mean(self, measure: str) -> np.ndarray:
+        return self.statistics[measure].mean()
+
+    def std(self, measure: str) -> np.ndarray:
+        return self.statistics[measure].std()
+
+    def quantiles(self, measure: str, qs: List[float]) -> np.ndarray:
+        return self.sketches[measure].quantiles(qs)
+
+def random_genetic_graph(n: int, seed: int) -> nx.Graph:
+    return RandomGeneticDataProvider(n = n, seed = seed).get_graph()
+
+class NullModelEnsemble():
+    def __init__(self,
+        strategy:        BackboneStrategy,
+        ps:              List[float],
+        n:               int                            = 71,
+        measures:        Optional[List[str]]            = None,
+        attribute:       Optional[str]                  = None,
+        graph_factory:   Callable[[int, int], nx.Graph] = random_genetic_graph,
+        workers:         int                            = 1,
+        chunk_size:      int                            = 8,
+        sketch_capacity: int                            = 128,
+        seed:            Optional[int]                  = None
+    ) -> NullModelEnsemble:
+        """
+        Each replicate draws a graph on n vertices from graph_factory, which
+        is given n and a seed and by default generates random genetic data,
+        extracts its backbone with the strategy, and adds every measure at
+        every threshold in ps to the summary. Only one graph per worker is
+        ever alive at a time. Thresholds apply to the strategy's own score
+        attribute unless another is given.
+
+        Replicates are run in chunks of chunk_size, in a pool of workers
+        processes when there is more than one. Each replicate has its own
+        seed spawned from the given one and the chunk summaries are always
+        merged in the same order, so a run is reproducible for a given seed
+        whatever the number of workers. The strategy and graph_factory must
+        be picklable to use more than one worker.
+        """
+        self.strategy        = strategy
+        self.ps              = np.asarray(ps, dtype = np.float64)
+        self.n               = n
+        self.measures        = list(measures) if measures is not None else list(ENSEMBLE_MEASURES)
+        self.attribute       = attribute if attribute is not None else strategy.attribute
+        self.graph_factory   = graph_factory
+        self.workers         = workers
+        self.chunk_size      = chunk_size
+        self.sketch_capacity = sketch_capacity
+        self.seed            = seed
+
+        unknown = [m for m in self.measures if m not in ENSEMBLE_MEASURES]
+        if unknown:
+            raise ValueError(f"Unknown ensemble measures: {', '.join(unknown)}.")
+
+    def replicate(self, seed: int) -> Dict[str, np.ndarray]:
+        """
+        Compute every measure at every threshold for a single replicate.
+        """
+        graph  = self.graph_factory(self.n, seed)
+        result = self.strategy.extract_backbone_result(graph)
+        sweep  = ThresholdSweep(result, self.ps, self.attribute)
+
+        return {m: np.asarray(ENSEMBLE_MEASURES[m](sweep), dtype = np.float64) for m in self.measures}
+
+    def run_chunk(self, seeds: List[int]) -> EnsembleSummary:
+        summary = EnsembleSummary(self.ps, self.measures, self.sketch_capacity)
+
+        for seed in seeds:
+            summary.add(self.replicate(seed))
+
+        return summary
+
+    def _seeds(self, num_replicates: int) -> List[int]:
+        return [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(self.seed).spawn(num_replicates)]
+
+    def run(self, num_replicates: int) -> EnsembleSummary:
+        seeds   = self._seeds(num_replicates)
+        chunks  = [seeds[i:i + self.chunk_size] for i in range(0, num_replicates, self.chunk_size)]
+        summary = EnsembleSummary(self.ps, self.measures, self.sketch_capacity)
+
+        if self.workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(
+                max_workers = self.workers,
+                initializer = _initialise_worker,
+                initargs    = (self,)
+            ) as executor:
+                for chunk_summary in executor.map(_run_chunk, chunks):
+                    summary.merge(chunk_summary)
+        else:
+            for chunk in chunks:
+                summary.merge(self.run_chunk(chunk))
+
+        return summary
+
+# The ensemble each worker process runs replicates of, shipped to it once
+# when the process pool starts.
+_worker_ensemble: Optional[NullModelEnsemble] = None
+
+def _initialise_worker(ensemble: NullModelEnsemble) -> None:
+    global _worker_ensemble
+    _worker_ensemble = ensemble
+
+def _run_chunk(seeds: List[int]) -> EnsembleSummary:
+    return _worker_ensemble.run_chunk(seeds)
@@ -1,12 +1,20 @@
-from typing import List, Optional, Tuple, Dict
+from __future__ import annotations
+from typing import Any, Callable, List, NamedTuple, Optional, Tuple, Dict
+from collections import OrderedDict
 from statistics import mean, stdev
+from types import MappingProxyType
+from weakref import WeakKeyDictionary
+import hashlib
+import sys
 
 import networkx as nx
 from networkx.classes.function import degree
 from networkx.generators import degree_seq
 import numpy    as np
 
-from scipy.optimize.minpack import leastsq
+from common import GraphArrays, graph_version
+
+from .sweep import ThresholdSweep
 
 def degree_sequence(
     graph:     nx.Graph,
@@ -196,33 +204,263 @@ def power_law(x, a, b):
     return a * np.power(x, b)
 
 def fit_power_law(seq: np.ndarray) -> Optional[float]:
-    xs  = np.array([x + 1 for x in range(len(seq))])
-
-    logx    = np.log10(xs)
-    logy    = np.log10(seq)
-    y_error = (0.2 * seq) / seq
-
-    fit_func = lambda p, x: p[0] + p[1] * x
-    err_func = lambda p, x, y, err: (y - fit_func(p, x)) / err
-
-    p_init = [1.0, -1.0]
-
-    try:
-        out = leastsq(err_func, p_init, args = (logx, logy, y_error), full_output = 1)
-        return out[0][1]
-    except:
-        return None
+    """
+    The exponent of a power law fitted to a sequence sorted in descending
+    order against its ranks, or None if there are fewer than two positive
+    values to fit.
+    """
+    exponents, _ = fit_power_laws([seq])
+    return None if np.isnan(exponents[0]) else float(exponents[0])
+
+def fit_power_laws(
+    sequences: List[np.ndarray],
+    errors:    Optional[List[np.ndarray]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fit y = a * x^b to each of a list of descending sequences against their
+    ranks 1, 2, ..., by weighted least squares in log-log space. The fits
+    are linear in log space so they have a closed form, and all of them are
+    solved at once by padding the sequences into a single matrix.
+
+    Each sequence may be given relative errors, which weight its points by
+    1 / error^2; by default every point is weighted equally. Non-positive
+    values can't be fitted in log space and are ignored.
+
+    Returns the exponents b and amplitudes a as arrays, with nan for every
+    sequence that has fewer than two points left to fit.
+    """
+    lengths = np.array([len(seq) for seq in sequences], dtype = np.int64)
+    width   = max(lengths.max(initial = 0), 1)
+
+    ys = np.zeros((len(sequences), width))
+    ws = np.zeros((len(sequences), width))
+    for (i, seq) in enumerate(sequences):
+        ys[i, :lengths[i]] = seq
+        ws[i, :lengths[i]] = 1 if errors is None else 1 / np.square(errors[i])
+
+    ws = np.where(ys > 0, ws, 0)
+
+    logx = np.log10(np.arange(1, width + 1))[None, :]
+    logy = np.log10(np.where(ys > 0, ys, 1))
+
+    sw   = ws.sum(axis = 1)
+    swx  = (ws * logx).sum(axis = 1)
+    swy  = (ws * logy).sum(axis = 1)
+    swxx = (ws * logx * logx).sum(axis = 1)
+    swxy = (ws * logx * logy).sum(axis = 1)
+
+    denominator = sw * swxx - swx ** 2
+    fitted      = (np.count_nonzero(ws, axis = 1) >= 2) & (denominator > 0)
+
+    with np.errstate(invalid = "ignore", divide = "ignore"):
+        exponents  = np.where(fitted, (sw * swxy - swx * swy) / denominator, np.nan)
+        amplitudes = np.where(fitted, np.power(10, (swy - exponents * swx) / sw), np.nan)
+
+    return exponents, amplitudes
 
 def degree_sequence_exponents(
     graph:     nx.Graph,
     ps:        List[float],
     attribute: str = "p"
-) -> Optional[float]:
-    return [degree_sequence_power_law_exponent(graph, p, attribute) for p in ps]
+) -> List[Optional[float]]:
+    sequences    = ThresholdSweep(graph, ps, attribute).degree_sequences()
+    exponents, _ = fit_power_laws(sequences)
+    return [None if np.isnan(b) else float(b) for b in exponents]
 
 def strength_sequence_exponents(
     graph:     nx.Graph,
     ps:        List[float],
     attribute: str = "p"
-) -> Optional[float]:
-    return [strength_sequence_power_law_exponent(graph, p, attribute) for p in ps]
+) -> List[Optional[float]]:
+    sequences    = ThresholdSweep(graph, ps, attribute).strength_sequences()
+    exponents, _ = fit_power_laws(sequences)
+    return [None if np.isnan(b) else float(b) for b in exponents]
+
+# Measures that a ThresholdSweep can compute for many values of p in one
+# pass, and the name of the corresponding sweep method.
+SWEPT_MEASURES = {
+    size:                "size",
+    order:               "order",
+    total_strength:      "total_strength",
+    average_strength:    "average_strength",
+    average_degree:      "average_degree",
+    average_edge_weight: "average_edge_weight"
+}
+
+def graph_fingerprint(graph: nx.Graph, attribute: str = "p") -> bytes:
+    """
+    A digest of a scored graph's vertices, edges, weights and scores, which
+    changes whenever any of them do.
+    """
+    arrays = GraphArrays(graph)
+    scores = np.fromiter(
+        (s for (_, _, s) in graph.edges(data = attribute)), dtype = np.float64, count = arrays.size())
+
+    digest = hashlib.blake2b(digest_size = 16)
+    digest.update(repr(arrays.nodes).encode())
+    digest.update(bytes([arrays.directed]))
+
+    for array in (arrays.sources, arrays.targets, arrays.weights, scores):
+        digest.update(array.tobytes())
+
+    return digest.digest()
+
+def _frozen(value: Any) -> Any:
+    """
+    An immutable copy of a measured value, so that callers can't change the
+    results held by a MeasureCache: lists become tuples and arrays become
+    read-only copies, and dicts read-only views of a copy.
+    """
+    if isinstance(value, np.ndarray):
+        value = value.copy()
+        value.flags.writeable = False
+        return value
+    elif isinstance(value, list):
+        return tuple(value)
+    elif isinstance(value, dict):
+        return MappingProxyType(dict(value))
+    else:
+        return value
+
+def _size_of(value: Any) -> int:
+    if isinstance(value, np.ndarray):
+        return sys.getsizeof(value) + (0 if value.base is None else value.nbytes)
+    elif isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sys.getsizeof(v) for v in value)
+    else:
+        return sys.getsizeof(value)
+
+class MeasureCacheInfo(NamedTuple):
+    hits:      int
+    misses:    int
+    max_bytes: int
+    bytes:     int
+    size:      int
+
+class MeasureCache():
+    """
+    A memory-bounded cache of measures of scored graphs at single
+    thresholds, which evicts the least recently used results once the
+    estimated size of those it holds exceeds max_bytes.
+
+    Results are keyed by a fingerprint of the graph's edges, weights and
+    scores along with the measure, attribute and p, so the same results are
+    shared between copies of a graph. Cached values are immutable: lists
+    are returned as tuples, and dicts and arrays as read-only.
+
+    Fingerprinting reads every edge, so it is done once per graph and
+    attribute and reused for as long as the graph's graph_version is the
+    same. Backbone strategies invalidate a graph when they write its scores,
+    but other in-place changes to weights or scores must be followed by
+    common.invalidate_graph.
+    """
+
+    def __init__(self, max_bytes: int = 64 << 20) -> MeasureCache:
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[Tuple, Tuple[Any, int]] = OrderedDict()
+        self.bytes     = 0
+        self.hits      = 0
+        self.misses    = 0
+
+        # The fingerprints of the graphs measured so far, by attribute, with
+        # the graph_version of the graph when each was taken.
+        self.fingerprints: WeakKeyDictionary = WeakKeyDictionary()
+
+    def fingerprint(self, graph: nx.Graph, attribute: str = "p") -> bytes:
+        """
+        The graph_fingerprint of the graph, computed only if the graph hasn't
+        been fingerprinted for this attribute or has changed since.
+        """
+        version      = graph_version(graph)
+        fingerprints = self.fingerprints.setdefault(graph, {})
+        entry        = fingerprints.get(attribute)
+
+        if entry is None or entry[0] != version:
+            entry = (version, graph_fingerprint(graph, attribute))
+            fingerprints[attribute] = entry
+
+        return entry[1]
+
+    def measure(self,
+        prop:      Callable[[nx.Graph, float, str], Any],
+        graph:     nx.Graph,
+        ps:        List[float],
+        attribute: str = "p"
+    ) -> List[Any]:
+        """
+        Compute prop for the graph at every p in ps, reusing any results
+        already cached and computing only the missing ones. Measures a
+        ThresholdSweep supports are computed for all missing thresholds in
+        one pass.
+        """
+        fingerprint = self.fingerprint(graph, attribute)
+        keys        = [(fingerprint, prop, attribute, float(p)) for p in ps]
+        values      = [self._get(key) for key in keys]
+        missing     = [i for (i, v) in enumerate(values) if v is None]
+
+        if missing:
+            if prop in SWEPT_MEASURES:
+                sweep    = ThresholdSweep(graph, [ps[i] for i in missing], attribute)
+                computed = getattr(sweep, SWEPT_MEASURES[prop])().tolist()
+            else:
+                computed = [prop(graph, ps[i], attribute) for i in missing]
+
+            for (i, value) in zip(missing, computed):
+                value     = _frozen(value)
+                values[i] = (value,)
+                self._put(keys[i], value)
+
+        return [v[0] for v in values]
+
+    def _get(self, key: Tuple) -> Optional[Tuple[Any]]:
+        entry = self.entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+
+        return (entry[0],)
+
+    def _put(self, key: Tuple, value: Any) -> None:
+        if key in self.entries:
+            self.bytes -= self.entries.pop(key)[1]
+
+        size = _size_of(value)
+        if size > self.max_bytes:
+            return
+
+        self.entries[key] = (value, size)
+        self.bytes       += size
+
+        while self.bytes > self.max_bytes:
+            _, (_, evicted) = self.entries.popitem(last = False)
+            self.bytes     -= evicted
+
+    def info(self) -> MeasureCacheInfo:
+        return MeasureCacheInfo(self.hits, self.misses, self.max_bytes, self.bytes, len(self.entries))
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.fingerprints.clear()
+        self.bytes  = 0
+        self.hits   = 0
+        self.misses = 0
+
+# The cache used by cached_measure unless another is given.
+default_measure_cache = MeasureCache()
+
+def cached_measure(
+    prop:      Callable[[nx.Graph, float, str], Any],
+    graph:     nx.Graph,
+    ps:        List[float],
+    attribute: str                    = "p",
+    cache:     Optional[MeasureCache] = None
+) -> List[Any]:
+    """
+    Compute prop for the graph at every p in ps through a MeasureCache, by
+    default one shared by the whole process.
+    """
+    return (cache if cache is not None else default_measure_cache).measure(prop, graph, ps, attribute)
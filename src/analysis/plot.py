@@ -5,9 +5,10 @@ from matplotlib import pyplot as plot
 import networkx as nx
 import numpy    as np
 
+from backbones import score_index
 from common import print_progress_bar
 
-from .measures import p_values
+from .measures import p_values, cached_measure
 
 def plot_graph_property(
     prop:      Callable[[nx.Graph, float], float],
@@ -20,7 +21,7 @@ def plot_graph_property(
     plot.clf()
 
     for backbone in backbones:
-        plot.plot(ps, [prop(backbone, p, attribute) for p in ps])
+        plot.plot(ps, cached_measure(prop, backbone, ps, attribute))
 
     plot.title(f"{name} vs {attribute}")
     if legend:
@@ -55,7 +56,7 @@ def plot_weights(
     p:         float = 0.1,
     attribute: str   = "p"
 ) -> None:
-    weights = [ graph[u][v]["weight"] for (u, v) in graph.edges if graph[u][v][attribute] < p]
+    weights = score_index(graph, attribute).weights_below(p)
 
     plot.hist(weights, 100)
     plot.show()
@@ -0,0 +1,279 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple, Optional
+
+import networkx as nx
+import numpy    as np
+import scipy.special as sc
+
+from .measures import degree_sequence, strength_sequence
+
+"""
+Maximum likelihood fitting of power laws to degree and strength
+distributions, following Clauset, Shalizi and Newman in 'Power-law
+distributions in empirical data'.
+"""
+
+# The exponents tried when fitting a discrete power law, whose maximum
+# likelihood estimate has no closed form. The best of these is refined by
+# fitting a parabola to the log likelihood around it.
+DISCRETE_ALPHAS = np.arange(1.01, 6.0, 0.01)
+
+# The most entries of the (candidate xmin, value) matrix compared at once
+# when computing KS statistics, to bound memory on large samples.
+KS_BLOCK_SIZE = 1 << 22
+
+class PowerLawFit(NamedTuple):
+    alpha:    float
+    xmin:     float
+    ks:       float
+    n_tail:   int
+    n:        int
+    discrete: bool
+
+def _discrete_alphas(n_tails: np.ndarray, log_sums: np.ndarray, xmins: np.ndarray) -> np.ndarray:
+    """
+    The maximum likelihood exponent of a discrete power law for each
+    candidate xmin at once, given the size of the tail at or above it and
+    the sum of the logs of the values in that tail.
+    """
+    log_zeta       = np.log(sc.zeta(DISCRETE_ALPHAS[:, None], xmins[None, :]))
+    log_likelihood = -n_tails[None, :] * log_zeta - DISCRETE_ALPHAS[:, None] * log_sums[None, :]
+
+    best    = np.argmax(log_likelihood, axis = 0)
+    inner   = np.clip(best, 1, len(DISCRETE_ALPHAS) - 2)
+    columns = np.arange(len(xmins))
+
+    left      = log_likelihood[inner - 1, columns]
+    middle    = log_likelihood[inner,     columns]
+    right     = log_likelihood[inner + 1, columns]
+    curvature = left - 2 * middle + right
+
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        offset = np.where(curvature < 0, 0.5 * (left - right) / curvature, 0)
+
+    # Maxima on the edge of the grid are left as they are.
+    offset = np.where(best == inner, np.clip(offset, -1, 1), 0)
+    step   = DISCRETE_ALPHAS[1] - DISCRETE_ALPHAS[0]
+
+    return DISCRETE_ALPHAS[best] + offset * step
+
+def _ks_statistics(
+    values:     np.ndarray,
+    cumulative: np.ndarray,
+    starts:     np.ndarray,
+    xmins:      np.ndarray,
+    alphas:     np.ndarray,
+    discrete:   bool
+) -> np.ndarray:
+    """
+    The KS distance between the empirical distribution of the tail starting
+    at each candidate and the power law fitted to it, for every candidate
+    at once.
+
+    values are the distinct sample values in ascending order, cumulative
+    the number of sample values at or below each of them, and starts the
+    index in values of the first value in each candidate's tail.
+    """
+    n       = cumulative[-1]
+    before  = np.concatenate([[0], cumulative[:-1]])
+    ks      = np.empty(len(starts))
+    block   = max(1, KS_BLOCK_SIZE // len(values))
+
+    for first in range(0, len(starts), block):
+        start = starts[first:first + block, None]
+        xmin  = xmins[first:first + block, None]
+        alpha = alphas[first:first + block, None]
+
+        below  = before[start]
+        n_tail = n - below
+        in_tail = np.arange(len(values))[None, :] >= start
+
+        # The empirical CDF of the tail at and just before each value.
+        at_value     = (cumulative[None, :] - below) / n_tail
+        before_value = (before[None, :] - below) / n_tail
+
+        with np.errstate(divide = "ignore", invalid = "ignore", over = "ignore"):
+            if discrete:
+                zeta_min     = sc.zeta(alpha, xmin)
+                model_at     = 1 - sc.zeta(alpha, values[None, :] + 1) / zeta_min
+                model_before = 1 - sc.zeta(alpha, values[None, :]) / zeta_min
+            else:
+                model_at     = 1 - np.power(values[None, :] / xmin, 1 - alpha)
+                model_before = model_at
+
+            distances = np.maximum(np.abs(at_value - model_at), np.abs(before_value - model_before))
+
+        ks[first:first + block] = np.max(np.where(in_tail, distances, 0), axis = 1)
+
+    return ks
+
+def fit_power_law_mle(
+    sample:   np.ndarray,
+    discrete: bool            = True,
+    xmin:     Optional[float] = None,
+    min_tail: int             = 10
+) -> Optional[PowerLawFit]:
+    """
+    Fit a power law p(x) ~ x^-alpha to the values of a sample at or above
+    xmin by maximum likelihood. Unless xmin is given, every distinct value
+    leaving at least min_tail values in the tail is tried as xmin, and the
+    one whose fit has the smallest KS distance to the tail is chosen.
+
+    Every candidate is fitted and tested at once: the tail sizes and log
+    sums come from suffix sums over the sorted distinct values, and the
+    KS distances from one matrix comparison of the empirical and fitted
+    CDFs. Discrete exponents are found on a grid, continuous ones in
+    closed form.
+
+    Returns None if no candidate xmin leaves a tail that can be fitted.
+    """
+    sample = np.asarray(sample, dtype = np.float64)
+    sample = sample[np.isfinite(sample) & (sample > 0)]
+
+    if len(sample) == 0:
+        return None
+
+    values, counts = np.unique(sample, return_counts = True)
+    cumulative     = np.cumsum(counts)
+    n_tails        = len(sample) - np.concatenate([[0], cumulative[:-1]])
+    log_sums       = np.cumsum((counts * np.log(values))[::-1])[::-1]
+
+    if xmin is None:
+        starts = np.flatnonzero(n_tails >= min_tail)
+        xmins  = values[starts]
+    else:
+        starts = np.flatnonzero(values >= xmin)[:1]
+        xmins  = np.full(len(starts), float(xmin))
+
+    if len(starts) == 0:
+        return None
+
+    n_tails  = n_tails[starts]
+    log_sums = log_sums[starts]
+
+    with np.errstate(divide = "ignore"):
+        if discrete:
+            alphas = _discrete_alphas(n_tails, log_sums, xmins)
+        else:
+            alphas = 1 + n_tails / (log_sums - n_tails * np.log(xmins))
+
+    ks = _ks_statistics(values, cumulative, starts, xmins, alphas, discrete)
+    ks = np.where(np.isfinite(alphas) & (alphas > 1) & np.isfinite(ks), ks, np.inf)
+
+    best = np.argmin(ks)
+    if not np.isfinite(ks[best]):
+        return None
+
+    return PowerLawFit(float(alphas[best]), float(xmins[best]), float(ks[best]), int(n_tails[best]), len(sample), discrete)
+
+def _synthetic_sample(rng: np.random.Generator, sample: np.ndarray, fit: PowerLawFit) -> np.ndarray:
+    """
+    Draw a sample of the same size as the original from the fitted model:
+    values in the tail come from the fitted power law, and the rest are
+    drawn uniformly from the original values below xmin. Discrete power law
+    values are drawn with the rounding approximation of Clauset et al.
+    """
+    body   = sample[sample < fit.xmin]
+    n_tail = rng.binomial(fit.n, fit.n_tail / fit.n) if len(body) > 0 else fit.n
+    scale  = np.power(1 - rng.random(n_tail), -1 / (fit.alpha - 1))
+
+    if fit.discrete:
+        tail = np.floor((fit.xmin - 0.5) * scale + 0.5)
+    else:
+        tail = fit.xmin * scale
+
+    return np.concatenate([rng.choice(body, fit.n - n_tail), tail])
+
+def _bootstrap_ks(
+    sample:   np.ndarray,
+    fit:      PowerLawFit,
+    min_tail: int,
+    seeds:    List[np.random.SeedSequence]
+) -> np.ndarray:
+    ks = np.empty(len(seeds))
+
+    for (i, seed) in enumerate(seeds):
+        synthetic     = _synthetic_sample(np.random.default_rng(seed), sample, fit)
+        synthetic_fit = fit_power_law_mle(synthetic, fit.discrete, min_tail = min_tail)
+
+        # A synthetic sample that can't be fitted at all fits worse than
+        # the original.
+        ks[i] = np.inf if synthetic_fit is None else synthetic_fit.ks
+
+    return ks
+
+# The sample and fit each worker process bootstraps, shipped to it once
+# when the process pool starts.
+_worker_sample:   Optional[np.ndarray]  = None
+_worker_fit:      Optional[PowerLawFit] = None
+_worker_min_tail: int                   = 0
+
+def _initialise_worker(sample: np.ndarray, fit: PowerLawFit, min_tail: int) -> None:
+    global _worker_sample, _worker_fit, _worker_min_tail
+    _worker_sample, _worker_fit, _worker_min_tail = sample, fit, min_tail
+
+def _bootstrap_chunk(seeds: List[np.random.SeedSequence]) -> np.ndarray:
+    return _bootstrap_ks(_worker_sample, _worker_fit, _worker_min_tail, seeds)
+
+def power_law_p_value(
+    sample:      np.ndarray,
+    fit:         PowerLawFit,
+    num_samples: int           = 1000,
+    min_tail:    int           = 10,
+    workers:     int           = 1,
+    seed:        Optional[int] = None
+) -> float:
+    """
+    The goodness of fit p value of a power law fitted to a sample: the
+    fraction of synthetic samples drawn from the fitted model whose own fit,
+    xmin scan included, is at least as far from them in KS distance.
+
+    With more than one worker the synthetic samples are fitted in a pool of
+    that many processes. Every synthetic sample has its own seed spawned
+    from the given one, so the p value is the same for any number of
+    workers.
+    """
+    sample = np.asarray(sample, dtype = np.float64)
+    sample = sample[np.isfinite(sample) & (sample > 0)]
+    seeds  = np.random.SeedSequence(seed).spawn(num_samples)
+
+    if workers > 1 and num_samples > 1:
+        num_chunks = min(num_samples, 4 * workers)
+        chunks     = [[seeds[i] for i in c] for c in np.array_split(np.arange(num_samples), num_chunks)]
+
+        with ProcessPoolExecutor(
+            max_workers = workers,
+            initializer = _initialise_worker,
+            initargs    = (sample, fit, min_tail)
+        ) as executor:
+            ks = np.concatenate(list(executor.map(_bootstrap_chunk, chunks)))
+    else:
+        ks = _bootstrap_ks(sample, fit, min_tail, seeds)
+
+    return float(np.mean(ks >= fit.ks))
+
+def degree_sequence_power_law_fit(
+    graph:     nx.Graph,
+    p:         float = 0.1,
+    attribute: str   = "p",
+    min_tail:  int   = 10
+) -> Optional[PowerLawFit]:
+    """
+    Fit a discrete power law to the degree distribution of the backbone at
+    p, as given by degree_sequence and degree_distribution.
+    """
+    return fit_power_law_mle(np.array(degree_sequence(graph, p, attribute)), True, min_tail = min_tail)
+
+def strength_sequence_power_law_fit(
+    graph:     nx.Graph,
+    p:         float = 0.1,
+    attribute: str   = "p",
+    discrete:  bool  = False,
+    min_tail:  int   = 10
+) -> Optional[PowerLawFit]:
+    """
+    Fit a power law to the strength distribution of the backbone at p.
+    Strengths are treated as continuous unless the weights are integers.
+    """
+    return fit_power_law_mle(np.array(strength_sequence(graph, p, attribute)), discrete, min_tail = min_tail)
@@ -17,7 +17,8 @@ from analysis  import (
     plot_means_and_stdevs,
     scatter_seq,
     plot_line,
-    degree_distribution
+    degree_distribution,
+    NullModelEnsemble
 )
 
 backbone_strategy = DisparityBackboneStrategy()
@@ -45,12 +46,11 @@ plot.title("Degree Distribution of vertices in backbone with $p = 0.5$")
 plot.grid()
 plot.show()
 exit()
-random_backbones = [backbone_strategy.extract_backbone(RandomGeneticDataProvider(n = graph_n).get_graph()) for _ in range(n_backbones)]
 ps = [p for p in np.linspace(0, 1, 100)]
 
-exponents = [degree_sequence_exponents(random_backbone, ps) for random_backbone in random_backbones]
+ensemble = NullModelEnsemble(backbone_strategy, ps, n = graph_n, measures = ["degree_exponent"], seed = 0).run(n_backbones)
 
-plot_means_and_stdevs(ps, exponents)
+plot_line(np.array(ps), ensemble.mean("degree_exponent"), 3 * np.nan_to_num(ensemble.std("degree_exponent")))
 plot_line(ps, degree_sequence_exponents(backbone, ps))
 # deeg = degree_sequence(backbone, 0.003)
 # print(deeg)
@@ -1,6 +1,9 @@
 from .backbone        import BackboneStrategy
-from .disparity       import DisparityBackboneStrategy
+from .result          import BackboneResult
+from .score_index     import ScoreIndex, score_index
+from .disparity       import DisparityBackboneStrategy, disparity_p_value_tensor
 from .threshold       import threshold
-from .polya           import PolyaBackboneStrategy
+from .polya           import PolyaBackboneStrategy, PValueCache
 from .hss             import HighSalienceSkeletonBackboneStrategy
-from .noise_corrected import noise_corrected
\ No newline at end of file
+from .noise_corrected import NoiseCorrectedBackboneStrategy, noise_corrected, delta_backbone
+from .composite       import CompositeBackboneStrategy
\ No newline at end of file
@@ -1,8 +1,32 @@
 from abc import ABC, abstractmethod
+from typing import Dict, List
 
 import networkx as nx
+import numpy    as np
+
+from common import GraphArrays, invalidate_graph
+
+from .result import BackboneResult
+
+def write_edge_scores(graph: nx.Graph, scores: Dict[str, np.ndarray]) -> None:
+    """
+    Write arrays of edge scores, aligned to the order of graph.edges, into
+    the graph as edge attributes named by their keys, in a single pass.
+    """
+    names  = list(scores.keys())
+    values = [scores[name].tolist() for name in names]
+
+    for ((_, _, attributes), *edge_values) in zip(graph.edges(data = True), *values):
+        for (name, value) in zip(names, edge_values):
+            attributes[name] = value
+
+    invalidate_graph(graph)
 
 class BackboneStrategy(ABC):
+    # Whether edges with high scores in this strategy's attribute are the
+    # ones kept, rather than those with low scores.
+    keep_high: bool = False
+
     @abstractmethod
     def extract_backbone(self, graph: nx.Graph) -> nx.Graph:
         pass
@@ -10,3 +34,27 @@ class BackboneStrategy(ABC):
     @abstractmethod
     def correct_p_value(self, graph: nx.Graph, p: float) -> float:
         pass
+
+    @abstractmethod
+    def edge_scores(self, graph: nx.Graph, arrays: GraphArrays) -> Dict[str, np.ndarray]:
+        """
+        Compute this strategy's scores for every edge of the graph, given its
+        array form, without modifying the graph. Returns a map from attribute
+        names to arrays aligned with the edges of arrays.
+        """
+        pass
+
+    def score_attributes(self) -> List[str]:
+        """
+        The names of every attribute edge_scores writes, starting with this
+        strategy's primary attribute.
+        """
+        return [self.attribute]
+
+    def extract_backbone_result(self, graph: nx.Graph) -> BackboneResult:
+        """
+        Score the edges of the graph without modifying it, returning the
+        scores as a BackboneResult keyed on this strategy's attribute.
+        """
+        arrays = GraphArrays(graph)
+        return BackboneResult.from_arrays(arrays, self.edge_scores(graph, arrays), self.attribute, self.keep_high)
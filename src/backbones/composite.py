@@ -0,0 +1,61 @@
+from __future__ import annotations
+from time import perf_counter
+from typing import Dict, List
+
+import networkx as nx
+import numpy    as np
+
+from common import GraphArrays
+
+from .backbone import BackboneStrategy, write_edge_scores
+
+class CompositeBackboneStrategy(BackboneStrategy):
+    """
+    Run several backbone strategies over the same graph in one pass. The
+    array form of the graph, with its vertex strengths, degrees and CSR
+    adjacency, is built once and shared between all of them, and every
+    strategy's scores are written into the graph together at the end.
+
+    The time spent in each strategy is recorded in timings, keyed by the
+    attribute it scores edges with.
+    """
+
+    def __init__(self, strategies: List[BackboneStrategy]) -> CompositeBackboneStrategy:
+        if len(strategies) == 0:
+            raise ValueError("A composite strategy needs at least one strategy.")
+
+        # Every attribute any strategy writes, secondary scores included, so
+        # that none are silently overwritten when the scores are merged.
+        attributes = [a for s in strategies for a in s.score_attributes()]
+        duplicates = {a for a in attributes if attributes.count(a) > 1}
+
+        if len(duplicates) > 0:
+            raise ValueError(f"Strategies would overwrite each other's scores: {', '.join(sorted(duplicates))}")
+
+        self.strategies = strategies
+        self.timings: Dict[str, float] = {}
+
+        # Results are sorted by the first strategy's scores.
+        self.attribute = strategies[0].attribute
+        self.keep_high = strategies[0].keep_high
+
+    def extract_backbone(self, graph: nx.Graph) -> nx.Graph:
+        write_edge_scores(graph, self.edge_scores(graph, GraphArrays(graph)))
+        return graph
+
+    def score_attributes(self) -> List[str]:
+        return [a for s in self.strategies for a in s.score_attributes()]
+
+    def edge_scores(self, graph: nx.Graph, arrays: GraphArrays) -> Dict[str, np.ndarray]:
+        scores = {}
+        self.timings = {}
+
+        for strategy in self.strategies:
+            start = perf_counter()
+            scores.update(strategy.edge_scores(graph, arrays))
+            self.timings[strategy.attribute] = perf_counter() - start
+
+        return scores
+
+    def correct_p_value(self, graph: nx.Graph, p: float) -> float:
+        return p
@@ -1,11 +1,18 @@
 from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import networkx as nx
+import numpy    as np
 
-from common import map_graph
+from scipy.sparse.csgraph import dijkstra
+from scipy.stats import norm
+
+from common import map_graph, GraphArrays
 
 from .threshold import threshold
-from .backbone import BackboneStrategy
+from .backbone import BackboneStrategy, write_edge_scores
 
 def proximity(weight) -> float:
     if weight != 0:
@@ -13,36 +20,261 @@ def proximity(weight) -> float:
     else:
         return float("inf")
 
+def shortest_path_tree_counts(arrays: GraphArrays, sources: Iterable[int]) -> np.ndarray:
+    """
+    Count, for every edge of the graph, the number of shortest path trees
+    rooted at the given source vertices that the edge belongs to.
+
+    A single Dijkstra search is run from each source, and every reachable
+    vertex is joined to its tree through a predecessor on a shortest path
+    to it, whose edges are added to the counts before moving on to the
+    next source. Only O(N + E) memory is ever in use.
+
+    Where a vertex has several shortest paths, the predecessor with the
+    lowest vertex index is chosen, so the counts never depend on the order
+    Dijkstra happens to settle vertices in. networkx instead keeps the
+    first path it finds, so salience can differ from one computed with
+    nx.all_pairs_dijkstra_path on graphs with tied shortest paths, such as
+    those with integer weights.
+    """
+    adjacency = arrays.adjacency().tocoo()
+    counts    = np.zeros(arrays.size(), dtype = np.int64)
+
+    # Every arc sorted by head then tail, so the first tight arc into a
+    # vertex comes from its lowest numbered predecessor.
+    order    = np.lexsort((adjacency.row, adjacency.col))
+    tails    = adjacency.row[order].astype(np.int64)
+    heads    = adjacency.col[order].astype(np.int64)
+    lengths  = adjacency.data[order]
+    not_loop = tails != heads
+
+    for s in sources:
+        distances = dijkstra(adjacency, indices = s)
+
+        with np.errstate(invalid = "ignore"):
+            tight = not_loop & (heads != s) & np.isfinite(distances[heads]) & (distances[tails] + lengths == distances[heads])
+
+        children = heads[tight]
+        first    = np.concatenate([[True], children[1:] != children[:-1]])
+        parents  = tails[tight][first]
+        children = children[first]
+
+        # A vertex has exactly one predecessor, so no edge appears twice
+        # in the same tree.
+        counts[arrays.edge_ids(parents, children)] += 1
+
+    return counts
+
+# The proximity graph each worker process counts shortest path trees in,
+# shipped to it once when the process pool starts.
+_worker_arrays: Optional[GraphArrays] = None
+
+def _initialise_worker(arrays: GraphArrays) -> None:
+    global _worker_arrays
+    _worker_arrays = arrays
+
+def _count_chunk(sources: np.ndarray) -> np.ndarray:
+    return shortest_path_tree_counts(_worker_arrays, sources)
+
+def worker_pool(arrays: GraphArrays, workers: int) -> ProcessPoolExecutor:
+    """
+    A pool of worker processes that count shortest path trees in the given
+    proximity graph, which is shipped to each of them once.
+    """
+    return ProcessPoolExecutor(
+        max_workers = workers,
+        initializer = _initialise_worker,
+        initargs    = (arrays,)
+    )
+
+def pooled_shortest_path_tree_counts(
+    executor: ProcessPoolExecutor,
+    arrays:   GraphArrays,
+    sources:  np.ndarray,
+    workers:  int
+) -> np.ndarray:
+    """
+    Split the source vertices into chunks and count the shortest path trees
+    rooted at each chunk in a pool made by worker_pool for the same arrays,
+    summing the partial counts.
+    """
+    # Use a few chunks per worker so that one slow chunk doesn't hold up
+    # the whole pool.
+    num_chunks = min(len(sources), 4 * workers)
+    chunks     = [c for c in np.array_split(sources, num_chunks) if len(c) > 0]
+
+    counts = np.zeros(arrays.size(), dtype = np.int64)
+
+    for partial_counts in executor.map(_count_chunk, chunks):
+        counts += partial_counts
+
+    return counts
+
+def parallel_shortest_path_tree_counts(arrays: GraphArrays, sources: np.ndarray, workers: int) -> np.ndarray:
+    """
+    Count the shortest path trees rooted at the source vertices in a pool
+    of worker processes. Gives exactly the same counts as
+    shortest_path_tree_counts.
+    """
+    with worker_pool(arrays, workers) as executor:
+        return pooled_shortest_path_tree_counts(executor, arrays, sources, workers)
+
+def salience_stderr(counts: np.ndarray, sampled: int, n: int) -> np.ndarray:
+    """
+    The standard error of salience estimated from the shortest path trees of
+    a sample of the vertices, drawn without replacement. Salience is the
+    proportion of trees an edge belongs to, so this is the standard error of
+    a sample proportion with a finite population correction, which vanishes
+    once every vertex has been sampled.
+    """
+    if sampled == 0:
+        return np.full(len(counts), np.inf)
+
+    proportion = counts / sampled
+    correction = (n - sampled) / (n - 1) if n > 1 else 0
+
+    return np.sqrt(proportion * (1 - proportion) / sampled * correction)
+
+def salience_half_widths(counts: np.ndarray, sampled: int, n: int, z: float) -> np.ndarray:
+    """
+    The half width of the Wilson score interval for salience estimated from
+    a sample of the vertices, with the same finite population correction as
+    salience_stderr. Unlike the interval given by the standard error, it
+    doesn't collapse to nothing for edges in none or all of the sampled
+    trees, so a small sample can't look precise.
+    """
+    if sampled == 0:
+        return np.full(len(counts), np.inf)
+
+    proportion = counts / sampled
+    correction = (n - sampled) / (n - 1) if n > 1 else 0
+    spread     = np.sqrt(proportion * (1 - proportion) / sampled + z ** 2 / (4 * sampled ** 2))
+
+    return z / (1 + z ** 2 / sampled) * spread * np.sqrt(correction)
+
 class HighSalienceSkeletonBackboneStrategy(BackboneStrategy):
-    def extract_backbone(self, graph: nx.Graph) -> nx.Graph:
-        proximity_graph = map_graph(graph, proximity)
-        shortest_paths  = dict(nx.all_pairs_dijkstra_path(proximity_graph))
+    keep_high = True
+
+    def __init__(self,
+        workers:     int             = 1,
+        sample_size: Optional[int]   = None,
+        tolerance:   Optional[float] = None,
+        confidence:  float           = 0.95,
+        batch_size:  int             = 64,
+        seed:        Optional[int]   = None,
+        attribute:   str             = "salience"
+    ) -> HighSalienceSkeletonBackboneStrategy:
+        """
+        With more than one worker the shortest path trees are computed
+        in a pool of that many processes.
+
+        By default salience is computed exactly, from the shortest path tree
+        of every vertex. Giving a sample_size instead estimates it from the
+        trees of that many randomly chosen vertices, while giving a tolerance
+        draws vertices in batches of batch_size until every edge's Wilson
+        score interval at the given confidence level is narrower than
+        +/- tolerance.
+        Sampled runs also store the standard error of each edge's salience
+        as "salience_stderr", and are reproducible for a given seed.
+
+        Salience is stored in the edge attribute with the given name, with
+        "_stderr" appended for its standard error.
+        """
+        if sample_size is not None and tolerance is not None:
+            raise ValueError("Only one of sample_size and tolerance may be given.")
+
+        self.workers     = workers
+        self.sample_size = sample_size
+        self.tolerance   = tolerance
+        self.confidence  = confidence
+        self.batch_size  = batch_size
+        self.seed        = seed
+        self.attribute   = attribute
+
+    def is_sampled(self) -> bool:
+        return self.sample_size is not None or self.tolerance is not None
+
+    def score_attributes(self) -> List[str]:
+        return [self.attribute, f"{self.attribute}_stderr"] if self.is_sampled() else [self.attribute]
+
+    def _count(self, arrays: GraphArrays, sources: np.ndarray) -> np.ndarray:
+        if self.workers > 1 and len(sources) > 1:
+            return parallel_shortest_path_tree_counts(arrays, sources, self.workers)
+        else:
+            return shortest_path_tree_counts(arrays, sources)
+
+    def _sampled_counts(self, arrays: GraphArrays) -> Tuple[np.ndarray, int]:
+        """
+        Count shortest path trees for a random sample of source vertices,
+        returning the counts and the number of sources sampled.
+        """
+        n       = arrays.order()
+        sources = np.random.default_rng(self.seed).permutation(n)
 
-        shortest_path_trees = {}
+        if self.sample_size is not None:
+            sample_size = min(self.sample_size, n)
+            return self._count(arrays, sources[:sample_size]), sample_size
 
-        for v in proximity_graph:
-            paths_from_v = shortest_paths[v]
-            shortest_path_trees[v] = nx.Graph()
+        z      = norm.ppf(0.5 + self.confidence / 2)
+        counts = np.zeros(arrays.size(), dtype = np.int64)
 
-            for u in proximity_graph:
-                if u in paths_from_v.keys() and len(paths_from_v[u]) > 1:
-                    path = paths_from_v[u]
-                    for i in range(len(path) - 1):
-                        shortest_path_trees[v].add_edge(path[i], path[i + 1])
+        # Every batch is counted in the same pool, so the arrays are only
+        # shipped to the workers once.
+        pooled = self.workers > 1 and min(self.batch_size, n) > 1
 
-        inverse_order = 1 / proximity_graph.order()
+        with worker_pool(arrays, self.workers) if pooled else nullcontext() as executor:
+            for start in range(0, n, self.batch_size):
+                batch = sources[start:start + self.batch_size]
 
-        salience = {
-            (v, u): inverse_order * len(
-                list(t for t in shortest_path_trees.values() if v in t and u in t[v]))
-            for v in proximity_graph
-            for u in proximity_graph[v]
-        }
+                if pooled:
+                    counts += pooled_shortest_path_tree_counts(executor, arrays, batch, self.workers)
+                else:
+                    counts += shortest_path_tree_counts(arrays, batch)
 
-        for (v, u) in graph.edges:
-            graph[v][u]["salience"] = salience[v,u]
+                sampled = start + len(batch)
+                if np.max(salience_half_widths(counts, sampled, n, z), initial = 0) <= self.tolerance:
+                    return counts, sampled
 
+        return counts, n
+
+    def extract_backbone(self, graph: nx.Graph) -> nx.Graph:
+        write_edge_scores(graph, self.edge_scores(graph, GraphArrays(graph)))
         return graph
 
+    def _proximity_arrays(self, graph: nx.Graph, arrays: GraphArrays) -> Tuple[GraphArrays, np.ndarray]:
+        """
+        Get the array form of the proximity graph, along with the position
+        of each of the graph's edges in it.
+        """
+        if not arrays.directed:
+            with np.errstate(divide = "ignore"):
+                proximities = np.where(arrays.weights != 0, 1 / arrays.weights, np.inf)
+
+            return arrays.with_weights(proximities), np.arange(arrays.size())
+
+        # The proximity graph of a directed graph is undirected, so edges in
+        # both directions between two vertices are merged into one.
+        proximity_arrays = GraphArrays(map_graph(graph, proximity))
+        to_proximity     = np.array([proximity_arrays.index[v] for v in arrays.nodes], dtype = np.int64)
+
+        return proximity_arrays, proximity_arrays.edge_ids(to_proximity[arrays.sources], to_proximity[arrays.targets])
+
+    def edge_scores(self, graph: nx.Graph, arrays: GraphArrays) -> Dict[str, np.ndarray]:
+        proximity_arrays, edges = self._proximity_arrays(graph, arrays)
+        n                       = proximity_arrays.order()
+
+        if self.is_sampled():
+            counts, sampled = self._sampled_counts(proximity_arrays)
+        else:
+            counts, sampled = self._count(proximity_arrays, np.arange(n)), n
+
+        salience = counts / max(sampled, 1)
+        scores   = {self.attribute: salience[edges]}
+
+        if self.is_sampled():
+            scores[f"{self.attribute}_stderr"] = salience_stderr(counts, sampled, n)[edges]
+
+        return scores
+
     def correct_p_value(self, graph: nx.Graph, p: float) -> float:
         return p
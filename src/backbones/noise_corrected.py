@@ -1,59 +1,126 @@
-import math
+from __future__ import annotations
+from typing import Dict, List
 
 import networkx as nx
-from networkx.algorithms.smallworld import sigma
+import numpy    as np
 
-from common import outgoing_strength, incoming_strength, strength
+from scipy.stats import norm
 
-def noise_corrected(G, delta: float):
-    total_weight = 0
+from common import GraphArrays
+
+from .backbone import BackboneStrategy, write_edge_scores
+
+"""
+An implementation of the Noise Corrected backbone proposed by Coscia and
+Neffke in 'Network Backboning with Noisy Data'.
+"""
 
-    backbone = G.copy()
+def delta_to_p(delta: float) -> float:
+    """
+    The p value threshold equivalent to keeping edges whose weight deviates
+    from its expected value by at least delta standard deviations.
 
-    for u, v, a in G.edges(data = True):
-        total_weight = total_weight + a["weight"]
-        
-    for u, v, a in G.edges(data = True):
-        weight = a["weight"]
+    p values underflow to 0 for deltas above about 37, so beyond that they
+    can no longer tell deltas apart; threshold on the scores themselves,
+    as delta_backbone does, instead.
+    """
+    return norm.sf(delta)
 
-        u_strength = 0
-        v_strength = 0
+def noise_corrected_scores(arrays: GraphArrays) -> np.ndarray:
+    """
+    Compute, for every edge at once, the number of standard deviations by
+    which its weight deviates from the value expected under the null
+    model. An edge survives the filter at delta if its score is at least
+    delta.
+    """
+    weights      = arrays.weights
+    total_weight = weights.sum()
 
-        if nx.is_directed(G):
-            u_strength = outgoing_strength(G, u)
-            v_strength = incoming_strength(G, v)
-        else:
-            u_strength = strength(G, u)
-            v_strength = strength(G, v)
+    u_strength = arrays.out_strengths[arrays.sources]
+    v_strength = arrays.in_strengths[arrays.targets]
 
-        expected_weight  = u_strength * (weight / total_weight)
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        expected_weight  = u_strength * (weights / total_weight)
         kappa            = 1 / expected_weight
-        weight_deviation = (kappa * weight - 1) / (kappa * weight + 1)
-        
+        weight_deviation = (kappa * weights - 1) / (kappa * weights + 1)
+
         sum_strengths  = u_strength + v_strength
         prod_strengths = u_strength * v_strength
 
         mu = (1 / total_weight) * (prod_strengths / total_weight)
-        sigma_squared = (1 / math.pow(total_weight, 2)) * (prod_strengths * (total_weight - u_strength) * (total_weight - v_strength) / math.pow(total_weight, 2) * (total_weight - 1))
+        sigma_squared = (1 / total_weight ** 2) * (prod_strengths * (total_weight - u_strength) * (total_weight - v_strength) / total_weight ** 2 * (total_weight - 1))
 
-        alpha = (math.pow(mu, 2) / sigma_squared) * (1 - mu) - mu
-        beta  = mu * (math.pow(1 - mu, 2) / sigma_squared) - mu
+        alpha = (mu ** 2 / sigma_squared) * (1 - mu) - mu
+        beta  = mu * ((1 - mu) ** 2 / sigma_squared) - mu
 
         expected_P = alpha / (alpha + beta)
-
-        if expected_P < 0:
-            expected_P = 0
+        expected_P = np.where(expected_P < 0, 0, expected_P)
 
         weight_variance    = total_weight * expected_P * (1 - expected_P)
-        d_kappa            = (1 / prod_strengths) - total_weight * (sum_strengths / math.pow(prod_strengths, 2))
-        deviation_variance = weight_variance * math.pow((2 * (kappa + weight * d_kappa)) / math.pow(kappa * weight + 1, 2), 2)
-
-        if deviation_variance < 0:
-            deviation_variance = 0
-
-        if weight_deviation < delta * math.sqrt(deviation_variance):
-            backbone.remove_edge(u, v)
-            print(f"Removed edge {(u, v)} with weight {a['weight']}")
+        d_kappa            = (1 / prod_strengths) - total_weight * (sum_strengths / prod_strengths ** 2)
+        deviation_variance = weight_variance * ((2 * (kappa + weights * d_kappa)) / (kappa * weights + 1) ** 2) ** 2
+        deviation_variance = np.where(deviation_variance < 0, 0, deviation_variance)
+
+        deviation_std = np.sqrt(deviation_variance)
+        scores        = weight_deviation / deviation_std
+
+    # With no variance an edge is kept at every delta unless its weight is
+    # below what is expected, and edges whose variance is undefined are
+    # never removed.
+    scores = np.where(deviation_std == 0, np.where(weight_deviation < 0, -np.inf, np.inf), scores)
+    scores = np.where(np.isnan(scores), np.inf, scores)
+
+    return scores
+
+class NoiseCorrectedBackboneStrategy(BackboneStrategy):
+    """
+    Rather than removing edges for a single delta, every edge is given its
+    score, in the score_attribute, and the p value of that score under a
+    standard normal distribution, in the attribute. Edges with p at most
+    delta_to_p(delta) are those the filter keeps at delta, for deltas
+    small enough that the p values don't underflow; edges with a score of
+    at least delta are exactly those it keeps at any delta.
+    """
+
+    def __init__(self, attribute: str = "p_nc", score_attribute: str = "delta") -> NoiseCorrectedBackboneStrategy:
+        self.attribute       = attribute
+        self.score_attribute = score_attribute
+
+    def extract_backbone(self, graph: nx.Graph) -> nx.Graph:
+        write_edge_scores(graph, self.edge_scores(graph, GraphArrays(graph)))
+        return graph
+
+    def score_attributes(self) -> List[str]:
+        return [self.attribute, self.score_attribute]
+
+    def edge_scores(self, graph: nx.Graph, arrays: GraphArrays) -> Dict[str, np.ndarray]:
+        scores = noise_corrected_scores(arrays)
+        return {self.attribute: norm.sf(scores), self.score_attribute: scores}
+
+    def correct_p_value(self, graph: nx.Graph, p: float) -> float:
+        return p
+
+def _edges_scoring_at_least(G, scores: np.ndarray, delta: float):
+    backbone = G.__class__()
+    backbone.graph.update(G.graph)
+    backbone.add_nodes_from(G.nodes(data = True))
+    backbone.add_edges_from(
+        (u, v, a) for ((u, v, a), score) in zip(G.edges(data = True), scores.tolist()) if score >= delta
+    )
 
     return backbone
-            
\ No newline at end of file
+
+def noise_corrected(G, delta: float):
+    """
+    Extract the noise corrected backbone of G at the given delta, leaving
+    G itself untouched.
+    """
+    return _edges_scoring_at_least(G, noise_corrected_scores(GraphArrays(G)), delta)
+
+def delta_backbone(G, delta: float, score_attribute: str = "delta"):
+    """
+    The noise corrected backbone of G at the given delta, from the scores
+    NoiseCorrectedBackboneStrategy has already written to its edges.
+    """
+    scores = np.fromiter((s for (_, _, s) in G.edges(data = score_attribute)), dtype = np.float64, count = G.number_of_edges())
+    return _edges_scoring_at_least(G, scores, delta)
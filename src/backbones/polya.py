@@ -1,73 +1,294 @@
 from __future__ import annotations
-from decimal import *
+from collections import OrderedDict
+from typing import Dict, Hashable, NamedTuple, Optional
 import math
 
 import networkx as nx
+import numpy    as np
 import scipy.special as sc
 
-from common import strength, degree
-from common.common import integrate
-from .backbone import BackboneStrategy
+from scipy.integrate import quad
+
+from common import GraphArrays
+from .backbone import BackboneStrategy, write_edge_scores
 
 """
 An implementation of the Pólya Filter proposed by Marcaccioli et al. in
 'A parametric approach to information filtering in complex networks: The Pólya Filter'
 """
 
+# Tail sums are evaluated in chunks of this many terms, doubling in size
+# each time the sum is not yet finished.
+INITIAL_CHUNK_SIZE = 1024
+
+# A tail sum stops once the terms left over are provably smaller than
+# this fraction of the sum so far.
+TAIL_TOLERANCE = 1e-16
+
+# Tails expected to need more terms than this are integrated instead of
+# summed term by term.
+MAX_SUMMED_TERMS = 1 << 12
+
+# How many standard deviations of the weight distribution a tail sum is
+# expected to cover before its terms become negligible.
+TAIL_WIDTH = 64
+
+# How many standard deviations either side of m / s the binomial tail
+# I_p(m, s - m + 1) is integrated over. Outside of this it is within
+# about 1e-300 of 0 or 1.
+BINOMIAL_WIDTH = 40
+
+# The number of Gauss-Legendre panels used either side of m / s when
+# integrating, and the nodes and weights used on each panel.
+QUADRATURE_PANELS = 16
+LEGENDRE_NODES, LEGENDRE_WEIGHTS = np.polynomial.legendre.leggauss(16)
+
+def polya_log_pmf(x: np.ndarray, k: int, s: int, a: float) -> np.ndarray:
+    """
+    The natural logarithm of the probability that a vertex with degree k
+    and strength s gives weight x to a single edge under the Pólya urn null
+    model, evaluated through log-gamma and log-beta functions so that it
+    stays finite for weights in the millions.
+    """
+    log_coef        = sc.gammaln(s + 1) - sc.gammaln(x + 1) - sc.gammaln(s - x + 1)
+    log_numerator   = sc.betaln((1 / a) + x, ((k - 1) / a) + s - x)
+    log_denominator = sc.betaln(1 / a, (k - 1) / a)
+    return log_coef + log_numerator - log_denominator
+
+def _tail_sum(k: int, s: int, a: float, start: int, stop: int, step: int, may_stop_early: bool) -> float:
+    """
+    Sum the pmf from x = start towards x = stop (exclusive) in the given
+    direction. The sum moves away from the bulk of the distribution, so once
+    the terms are decreasing they stay decreasing and the sum can stop as
+    soon as the last term times the number of terms left is negligible.
+    """
+    total      = 0.0
+    chunk_size = INITIAL_CHUNK_SIZE
+    x          = start
+
+    while (x - stop) * step < 0:
+        chunk_stop = x + step * chunk_size
+        chunk_stop = min(chunk_stop, stop) if step > 0 else max(chunk_stop, stop)
+
+        terms  = np.exp(polya_log_pmf(np.arange(x, chunk_stop, step), k, s, a))
+        total += terms.sum()
+        x      = chunk_stop
+
+        remaining = abs(stop - x)
+        if (may_stop_early and len(terms) > 1 and terms[-1] <= terms[-2]
+                and terms[-1] * remaining <= TAIL_TOLERANCE * total):
+            break
+
+        chunk_size *= 2
+
+    return total
+
+def _mixture_survival(k: int, s: int, m: int, a: float) -> float:
+    """
+    P(X >= m) for the Pólya urn weight X, found by integrating the binomial
+    tail I_p(m, s - m + 1) against the Beta(1 / a, (k - 1) / a) distribution
+    of p that the urn mixes over. Only the region where the binomial tail
+    is not 0 or 1 needs numerical integration; above it the integral is
+    the survival function of the beta distribution.
+    """
+    alpha, beta = 1 / a, (k - 1) / a
+    log_norm    = sc.betaln(alpha, beta)
+
+    c     = m / s
+    width = BINOMIAL_WIDTH * (math.sqrt(c * (1 - c) / s) + 1 / s)
+    lower = max(c - width, 0.0)
+    upper = min(c + width, 1.0)
+
+    if lower > 0:
+        # The integrand is smooth away from p = 0, so a composite
+        # Gauss-Legendre rule over panels either side of m / s, evaluated
+        # in one vectorised call, is enough.
+        edges = np.concatenate([
+            np.linspace(lower, c, QUADRATURE_PANELS + 1),
+            np.linspace(c, upper, QUADRATURE_PANELS + 1)[1:]
+        ])
+        half_widths = (edges[1:] - edges[:-1]) / 2
+        midpoints   = (edges[1:] + edges[:-1]) / 2
+
+        ps      = (midpoints[:, None] + half_widths[:, None] * LEGENDRE_NODES[None, :]).ravel()
+        weights = (half_widths[:, None] * LEGENDRE_WEIGHTS[None, :]).ravel()
+
+        log_density = (alpha - 1) * np.log(ps) + (beta - 1) * np.log1p(-ps) - log_norm
+        middle      = np.sum(weights * sc.betainc(m, s - m + 1, ps) * np.exp(log_density))
+    else:
+        # Otherwise the p^(alpha - 1) singularity at zero is left to an
+        # algebraic-weight adaptive rule.
+        def integrand(p: float) -> float:
+            return sc.betainc(m, s - m + 1, p) * math.exp((beta - 1) * math.log1p(-p) - log_norm)
+
+        middle, _ = quad(integrand, 0, upper,
+            weight = "alg",
+            wvar   = (alpha - 1, 0),
+            epsabs = 0,
+            epsrel = 1e-10,
+            limit  = 200
+        )
+
+    return middle + sc.betaincc(alpha, beta, upper)
+
+def polya_p_value(k: int, s: int, w: int, a: float) -> float:
+    """
+    The p value of an integer weight w on an edge of a vertex with degree k
+    and strength s, that is one minus the pmf summed over x in [0, w - 1).
+
+    Rather than always summing that range, whichever tail of the
+    distribution lies away from its mean s / k is summed directly, since
+    that tail's terms shrink quickly and it can be cut off early. Tails
+    that would still take too many terms, as happens for strengths in the
+    millions, are integrated instead.
+    """
+    if k <= 1 or w <= 1:
+        return 1.0
+
+    alpha, beta = 1 / a, (k - 1) / a
+    mean        = s / k
+    upper_tail  = w - 1 > mean
+
+    # When both beta parameters are below one the distribution is U shaped,
+    # so decreasing terms can rise again and the whole tail must be summed.
+    may_stop_early = alpha >= 1 or beta >= 1
+
+    num_terms = s - w + 2 if upper_tail else w - 1
+    if may_stop_early:
+        variance  = s * alpha * beta * (alpha + beta + s) / ((alpha + beta) ** 2 * (alpha + beta + 1))
+        num_terms = min(num_terms, TAIL_WIDTH * math.sqrt(variance))
+
+    if num_terms > MAX_SUMMED_TERMS:
+        p = _mixture_survival(k, s, w - 1, a)
+    elif upper_tail:
+        p = _tail_sum(k, s, a, w - 1, s + 1, 1, may_stop_early)
+    else:
+        p = 1 - _tail_sum(k, s, a, w - 2, -1, -1, may_stop_early)
+
+    return min(max(p, 0.0), 1.0)
+
+class CacheInfo(NamedTuple):
+    hits:     int
+    misses:   int
+    max_size: int
+    size:     int
+
+class PValueCache():
+    """
+    A bounded cache of p values which evicts the least recently used entry
+    once full. Keys are (k, s, w, a, integer_weights) tuples, so a single
+    cache can safely be shared between strategies with different parameters.
+    """
+
+    def __init__(self, max_size: int = 1 << 20) -> PValueCache:
+        self.max_size = max_size
+        self.entries: OrderedDict[Hashable, float] = OrderedDict()
+        self.hits     = 0
+        self.misses   = 0
+
+    def get(self, key: Hashable) -> Optional[float]:
+        p = self.entries.get(key)
+
+        if p is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+
+        return p
+
+    def put(self, key: Hashable, p: float) -> None:
+        self.entries[key] = p
+        self.entries.move_to_end(key)
+
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last = False)
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.max_size, len(self.entries))
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.hits   = 0
+        self.misses = 0
+
 class PolyaBackboneStrategy(BackboneStrategy):
-    def __init__(self, a: float, integer_weights = True) -> PolyaBackboneStrategy:
+    def __init__(self,
+        a:               float,
+        integer_weights: bool                  = True,
+        cache_size:      int                   = 1 << 20,
+        cache:           Optional[PValueCache] = None,
+        attribute:       str                   = "p_polya"
+    ) -> PolyaBackboneStrategy:
+        """
+        Many edges share the same endpoint degree, strength and weight, so
+        p values are memoised. The cache lives as long as the strategy, so
+        every graph a data provider applies the strategy to shares it. An
+        existing cache may be passed in to share it more widely.
+
+        The p values are stored in the edge attribute with the given name.
+        """
         self.a               = a
         self.integer_weights = integer_weights
+        self.cache           = cache if cache is not None else PValueCache(cache_size)
+        self.attribute       = attribute
+
+    def cache_info(self) -> CacheInfo:
+        return self.cache.info()
 
     def extract_backbone(self, graph: nx.Graph) -> nx.Graph:
-        for (v, u) in graph.edges():
-            w = graph[v][u]["weight"]
+        write_edge_scores(graph, self.edge_scores(graph, GraphArrays(graph)))
+        return graph
+
+    def edge_scores(self, graph: nx.Graph, arrays: GraphArrays) -> Dict[str, np.ndarray]:
+        # Every vertex's degree and strength are computed once up front
+        # rather than once per term of every p value.
+        degrees   = arrays.degrees.tolist()
+        strengths = arrays.strengths.tolist()
+        p_values  = np.empty(arrays.size())
+
+        for (e, (i, j, w)) in enumerate(zip(arrays.sources.tolist(), arrays.targets.tolist(), arrays.weights.tolist())):
             ps = []
-                
-            ps.append(self._compute_p_value(graph, v, w))
-            if not graph.is_directed:
-                ps.append(self._compute_p_value(graph, u, w))
 
-            graph[v][u]["p"] = min(ps)
+            ps.append(self._compute_p_value(degrees[i], strengths[i], w))
+            if not graph.is_directed():
+                ps.append(self._compute_p_value(degrees[j], strengths[j], w))
 
-        return graph
+            p_values[e] = min(ps)
+
+        return {self.attribute: p_values}
 
     def correct_p_value(self, graph: nx.Graph, p: float) -> float:
         return p
 
         num_tests = len(graph.edges())
-        if not graph.is_directed:
+        if not graph.is_directed():
             return p / (2 * num_tests)
         else:
             return p / num_tests
 
-    def _pmf(self, graph: nx.Graph, v, w) -> float:
-        k = degree(graph,   v)
-        s = strength(graph, v)
-
-        coef        = Decimal(sc.comb(s, w, exact = True))
-        numerator   = Decimal(sc.beta((1 / self.a) + w, ((k - 1) / self.a) + s - w))
-        denominator = Decimal(sc.beta(1 / self.a, (k - 1) / self.a))
-        return float(coef * (numerator / denominator))
-
-    def _p_approximation(self, graph: nx.Graph, v, w) -> float:
+    def _p_approximation(self, k: int, s: float, w: float) -> float:
         """
         The Pólya filter was designed with integer-weighted graphs in mind.
         In order to apply it to graphs with non-integer weights, we use
         the approximation given in (A1) on page 11 of Marcaccioli et al.'s
         paper.
         """
-        k = degree(graph,   v)
-        s = strength(graph, v)
-        
         t1 = (1 / sc.gamma(1 / self.a))
         t2 = math.pow(1 - (w / s), (k - 1) / self.a)
         t3 = math.pow((w * k) / (s * self.a), (1 / self.a) - 1)
         return t1 * t2 * t3
 
+    def _compute_p_value(self, k: int, s: float, w) -> float:
+        key = (k, s, w, self.a, self.integer_weights)
+        p   = self.cache.get(key)
 
-    def _compute_p_value(self, graph: nx.Graph, v, w) -> float:
-        if self.integer_weights:
-            return 1 - sum([self._pmf(graph, v, x) for x in range(0, w - 1)])
-        else:
-            return self._p_approximation(graph, v, w)
+        if p is None:
+            if self.integer_weights:
+                p = polya_p_value(k, int(round(s)), int(w), self.a)
+            else:
+                p = self._p_approximation(k, s, w)
+
+            self.cache.put(key, p)
+
+        return p
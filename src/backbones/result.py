@@ -0,0 +1,107 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+
+import networkx as nx
+import numpy    as np
+
+from common import GraphArrays
+
+class BackboneResult():
+    """
+    The scores a backbone strategy gives to the edges of a graph, held as
+    columns rather than as networkx edge attributes.
+
+    Edges are stored as vertex index arrays sorted by the primary score,
+    from the edges kept first to those kept last, so the edges passing any
+    threshold are a prefix of every column and can be taken as views
+    without copying. Vertex indices refer to nodes.
+
+    Edges pass a threshold p by scoring below it, like p values, or, with
+    keep_high, by scoring above it, like salience.
+    """
+
+    def __init__(self,
+        nodes:     List[Any],
+        sources:   np.ndarray,
+        targets:   np.ndarray,
+        weights:   np.ndarray,
+        scores:    Dict[str, np.ndarray],
+        attribute: str,
+        directed:  bool = False,
+        keep_high: bool = False
+    ) -> BackboneResult:
+        keys  = -np.asarray(scores[attribute], dtype = np.float64) if keep_high else np.asarray(scores[attribute], dtype = np.float64)
+        order = np.argsort(keys, kind = "stable")
+
+        self.nodes     = nodes
+        self.directed  = directed
+        self.attribute = attribute
+        self.keep_high = keep_high
+        self._keys     = keys[order]
+        self.sources   = sources[order]
+        self.targets   = targets[order]
+        self.weights   = weights[order]
+        self.scores    = {name: np.ascontiguousarray(s[order], dtype = np.float64) for (name, s) in scores.items()}
+
+    @staticmethod
+    def from_arrays(
+        arrays:    GraphArrays,
+        scores:    Dict[str, np.ndarray],
+        attribute: str,
+        keep_high: bool = False
+    ) -> BackboneResult:
+        return BackboneResult(
+            arrays.nodes,
+            arrays.sources,
+            arrays.targets,
+            arrays.weights,
+            scores,
+            attribute,
+            arrays.directed,
+            keep_high
+        )
+
+    def order(self) -> int:
+        return len(self.nodes)
+
+    def size(self, p: Optional[float] = None) -> int:
+        """
+        The number of edges, or the number of edges passing p.
+        """
+        if p is None:
+            return len(self.weights)
+        else:
+            return int(np.searchsorted(self._keys, -p if self.keep_high else p, side = "left"))
+
+    def score(self, attribute: Optional[str] = None) -> np.ndarray:
+        return self.scores[self.attribute if attribute is None else attribute]
+
+    def threshold(self, p: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        The sources, targets, weights and scores of the edges passing p, as
+        views into this result's columns.
+        """
+        n = self.size(p)
+        return self.sources[:n], self.targets[:n], self.weights[:n], self.scores[self.attribute][:n]
+
+    def to_networkx(self, p: Optional[float] = None) -> nx.Graph:
+        """
+        Build a networkx graph containing every vertex and the edges passing
+        p, or all edges if p is not given, with their weights and scores as
+        edge attributes.
+        """
+        n     = self.size(p)
+        nodes = self.nodes
+        names = list(self.scores.keys())
+
+        columns = [self.sources[:n].tolist(), self.targets[:n].tolist(), self.weights[:n].tolist()]
+        columns.extend(self.scores[name][:n].tolist() for name in names)
+
+        graph = nx.DiGraph() if self.directed else nx.Graph()
+        graph.add_nodes_from(nodes)
+        graph.add_edges_from(
+            (nodes[v], nodes[u], dict(zip(names, values), weight = w))
+            for (v, u, w, *values) in zip(*columns)
+        )
+
+        return graph
@@ -0,0 +1,100 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+import networkx as nx
+import numpy    as np
+
+from common import GraphArrays, graph_version
+
+from .result import BackboneResult
+
+class ScoreIndex(BackboneResult):
+    """
+    The edges of a scored graph sorted by one score attribute, so that the
+    edges scoring below any p are found with a binary search and returned
+    as a slice, rather than by scanning every edge.
+
+    Alongside the columns of a BackboneResult the index keeps prefix sums of
+    the weights in score order, and the graph_version of the graph it was
+    built from. Edges are returned as (u, v) vertex pairs, built only for
+    the slice asked for.
+    """
+
+    def __init__(self, graph: nx.Graph, attribute: str = "p", weight: str = "weight") -> ScoreIndex:
+        arrays = GraphArrays(graph, weight)
+        scores = np.fromiter(
+            (s for (_, _, s) in graph.edges(data = attribute)), dtype = np.float64, count = arrays.size())
+
+        super().__init__(
+            arrays.nodes,
+            arrays.sources,
+            arrays.targets,
+            arrays.weights,
+            {attribute: scores},
+            attribute,
+            arrays.directed
+        )
+
+        self.version            = graph_version(graph)
+        self.cumulative_weights = np.concatenate([[0], np.cumsum(self.weights)])
+
+    def edges(self, start: int = 0, stop: Optional[int] = None) -> List[Tuple[Any, Any]]:
+        """
+        The (u, v) pairs of the edges from position start up to stop in
+        ascending score order.
+        """
+        nodes   = self.nodes
+        sources = self.sources[start:stop].tolist()
+        targets = self.targets[start:stop].tolist()
+
+        return [(nodes[v], nodes[u]) for (v, u) in zip(sources, targets)]
+
+    def edges_below(self, p: float) -> List[Tuple[Any, Any]]:
+        """
+        The edges scoring below p, as (u, v) pairs in ascending score order.
+        """
+        return self.edges(0, self.size(p))
+
+    def edges_between(self, p1: float, p2: float) -> List[Tuple[Any, Any]]:
+        """
+        The edges that are added when the threshold is raised from p1 to p2,
+        that is those scoring at least p1 but below p2.
+        """
+        return self.edges(self.size(p1), self.size(p2))
+
+    def edges_at_least(self, p: float) -> List[Tuple[Any, Any]]:
+        return self.edges(self.size(p))
+
+    def weights_below(self, p: float) -> np.ndarray:
+        return self.weights[:self.size(p)]
+
+    def total_weight_below(self, p: float) -> float:
+        return float(self.cumulative_weights[self.size(p)])
+
+    def is_current(self, graph: nx.Graph) -> bool:
+        """
+        Check that the graph hasn't changed shape or been invalidated since
+        the index was built.
+        """
+        return self.version == graph_version(graph)
+
+# Indexes built by score_index, kept only for as long as their graph is alive.
+_cached_indexes: WeakKeyDictionary = WeakKeyDictionary()
+
+def score_index(graph: nx.Graph, attribute: str = "p") -> ScoreIndex:
+    """
+    Get the ScoreIndex of a graph for the given attribute, building it only
+    if it hasn't already been built or the graph has changed since, as
+    judged by its graph_version. Scores written by a backbone strategy
+    invalidate the graph, but other in-place changes to scores or weights
+    must be followed by common.invalidate_graph.
+    """
+    indexes: Dict[str, ScoreIndex] = _cached_indexes.setdefault(graph, {})
+    index = indexes.get(attribute)
+
+    if index is None or not index.is_current(graph):
+        index = ScoreIndex(graph, attribute)
+        indexes[attribute] = index
+
+    return index
\ No newline at end of file
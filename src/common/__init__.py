@@ -1,3 +1,5 @@
-from .common import strength, integrate, degree, map_graph, incoming_strength, outgoing_strength
-from .clustering import Clustering
-from .progress_bar import print_progress_bar
\ No newline at end of file
+from .common import strength, integrate, degree, map_graph, incoming_strength, outgoing_strength, StrengthIndex, strength_index
+from .clustering import Clustering, ClusteringSet
+from .progress_bar import print_progress_bar
+from .graph_arrays import GraphArrays
+from .graph_versions import graph_version, invalidate_graph
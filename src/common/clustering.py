@@ -1,6 +1,8 @@
 from __future__ import annotations
 from typing import Dict, List, Optional
 
+import numpy as np
+
 class Clustering():
     """
     A class for wrapping clusterings of vertices so that
@@ -31,10 +33,7 @@ class Clustering():
         or None if the vertex is not present
         in the clustering.
         """
-        if v in self.reverse_map.keys():
-            return self.reverse_map[v]
-        else:
-            return None
+        return self.reverse_map.get(v)
 
     def co_clustered(self, v, u) -> bool:
         c_v = self.get_cluster_of(v)
@@ -45,6 +44,18 @@ class Clustering():
         else:
             return False
 
+    def labels(self, vertices: List) -> np.ndarray:
+        """
+        Get the index in get_cluster_list of the cluster each of the given
+        vertices is in, as an integer array aligned to vertices, with -1
+        for vertices not present in the clustering.
+        """
+        codes = {k: i for (i, k) in enumerate(self.cluster_map.keys())}
+
+        return np.array([
+            codes[self.reverse_map[v]] if v in self.reverse_map else -1 for v in vertices
+        ], dtype = np.int64)
+
     def get_cluster_named(self, c) -> Optional[int]:
         """
         Get the cluster with the given name,
@@ -69,3 +80,87 @@ class Clustering():
         Get the number of clusters in this clustering.
         """
         return len(self.cluster_list)
+
+class ClusteringSet():
+    """
+    Several clusterings of the same vertices, held as a (vertices,
+    clusterings) matrix of integer cluster labels with a shared vertex
+    index, so that many clusterings can be queried at once.
+
+    The labels of each clustering number its clusters in the order they
+    first appear, matching Clustering.labels, and Clustering objects are
+    built from the matrix on demand.
+    """
+
+    def __init__(self,
+        vertices:      List,
+        names:         List[str],
+        labels:        np.ndarray,
+        cluster_names: List[List]
+    ) -> ClusteringSet:
+        """
+        Row i of labels holds the clusters of vertices[i] in each of the
+        clusterings, column j belonging to the clustering names[j], and
+        cluster_names[j][c] is the name of cluster c of that clustering.
+        """
+        self.vertices      = vertices
+        self.names         = names
+        self.labels        = labels
+        self.cluster_names = cluster_names
+        self.index         = {v: i for (i, v) in enumerate(vertices)}
+        self.columns       = {n: j for (j, n) in enumerate(names)}
+
+        self._clusterings: Dict[str, Clustering] = {}
+
+    def get_num_clusterings(self) -> int:
+        return len(self.names)
+
+    def get_clustering(self, name: str) -> Clustering:
+        """
+        Get the clustering with the given name as a Clustering.
+        """
+        if name not in self._clusterings:
+            j        = self.columns[name]
+            clusters = {c: [] for c in self.cluster_names[j]}
+
+            for (v, label) in zip(self.vertices, self.labels[:, j].tolist()):
+                clusters[self.cluster_names[j][label]].append(v)
+
+            self._clusterings[name] = Clustering(clusters)
+
+        return self._clusterings[name]
+
+    def get_clusterings(self) -> Dict[str, Clustering]:
+        return {n: self.get_clustering(n) for n in self.names}
+
+    def labels_for(self, vertices: List) -> np.ndarray:
+        """
+        Get a (clusterings, vertices) matrix of the cluster labels of the
+        given vertices, with -1 for vertices not in the set.
+        """
+        rows   = np.array([self.index.get(v, -1) for v in vertices], dtype = np.int64)
+        labels = self.labels.T[:, rows] if len(rows) > 0 else np.empty((len(self.names), 0), dtype = np.int64)
+
+        return np.where(rows[None, :] >= 0, labels, -1)
+
+    def co_clustered(self, vs: List, us: List) -> np.ndarray:
+        """
+        Check whether each pair of vertices (vs[i], us[i]) is in the same
+        cluster, in every clustering at once, as a (pairs, clusterings)
+        boolean array. As with Clustering.co_clustered, a pair involving a
+        vertex not in the set is never co-clustered.
+        """
+        v_rows = np.array([self.index.get(v, -1) for v in vs], dtype = np.int64)
+        u_rows = np.array([self.index.get(u, -1) for u in us], dtype = np.int64)
+
+        return self.co_clustered_indices(v_rows, u_rows)
+
+    def co_clustered_indices(self, v_rows: np.ndarray, u_rows: np.ndarray) -> np.ndarray:
+        """
+        As co_clustered, but for pairs given by their rows in the label
+        matrix, with -1 for vertices not in the set.
+        """
+        present = (v_rows >= 0) & (u_rows >= 0)
+        same    = self.labels[v_rows] == self.labels[u_rows]
+
+        return same & present[:, None]
@@ -1,4 +1,6 @@
-from typing import Callable, Optional, Iterable
+from __future__ import annotations
+from typing import Callable, Optional, Iterable, List
+from weakref import WeakKeyDictionary
 
 import networkx as nx
 import numpy    as np
@@ -6,6 +8,9 @@ import pandas   as pd
 
 from scipy.integrate import quad
 
+from .graph_arrays import GraphArrays
+from .graph_versions import graph_version
+
 def integrand(k):
     return lambda x: (k - 1) * (1 - x) ** (k - 2)
 
@@ -21,17 +26,69 @@ def integrate(l: float, u: float,
     else:
         return quad(fn, l, u)
 
+class StrengthIndex():
+    """
+    The strength and degree of every vertex of a graph, in and out, built
+    once in a single batched pass and looked up by vertex. Strengths are
+    ints when every weight in the graph is.
+    """
+
+    def __init__(self, G: nx.Graph) -> StrengthIndex:
+        self.version  = graph_version(G)
+        self.arrays   = GraphArrays(G)
+        self.integral = all(isinstance(w, (int, np.integer)) for (_, _, w) in G.edges(data = "weight"))
+
+        arrays = self.arrays
+
+        self.strengths     = self._values(arrays.strengths)
+        self.in_strengths  = self._values(arrays.in_strengths)
+        self.out_strengths = self._values(arrays.out_strengths)
+        self.degrees       = arrays.degrees.tolist()
+
+    def _values(self, strengths: np.ndarray) -> List:
+        return strengths.astype(np.int64).tolist() if self.integral else strengths.tolist()
+
+    def is_current(self, G: nx.Graph) -> bool:
+        return self.version == graph_version(G)
+
+# Strength indexes built by strength_index, kept only for as long as their
+# graph is alive.
+_strength_indexes: WeakKeyDictionary = WeakKeyDictionary()
+
+def strength_index(G: nx.Graph) -> StrengthIndex:
+    """
+    Get the StrengthIndex of a graph, building it only if it hasn't already
+    been built or the graph has changed since, as judged by its
+    graph_version. In-place changes to weights, or swapping one edge for
+    another, must be followed by invalidate_graph.
+    """
+    index = _strength_indexes.get(G)
+
+    if index is None or not index.is_current(G):
+        index = StrengthIndex(G)
+        _strength_indexes[G] = index
+
+    return index
+
+# These look a vertex up in the graph's strength index, so after the first
+# call on a graph each costs O(1). Directed graphs give outgoing strength
+# and degree for strength and degree.
+
 def strength(G, v) -> float:
-    return sum(G[v][u]["weight"] for u in G[v])
+    index = strength_index(G)
+    return index.strengths[index.arrays.index[v]]
 
 def incoming_strength(G, v) -> float:
-    return sum(G[u][v]["weight"] for u in G if v in G[u])
+    index = strength_index(G)
+    return index.in_strengths[index.arrays.index[v]]
 
 def outgoing_strength(G, v) -> float:
-    return sum(G[v][u]["weight"] for u in G[v])
+    index = strength_index(G)
+    return index.out_strengths[index.arrays.index[v]]
 
 def degree(G, v) -> int:
-    return len(G[v])
+    index = strength_index(G)
+    return index.degrees[index.arrays.index[v]]
 
 def map_graph(G, fn: Callable[[float], float], weight: str = "weight"):
     mapped_weights = [
@@ -0,0 +1,124 @@
+from __future__ import annotations
+from copy import copy
+from typing import Any, Dict, List, Optional
+
+import networkx as nx
+import numpy    as np
+
+from scipy.sparse import csr_matrix
+
+class GraphArrays():
+    """
+    A compact, array-based view of a weighted graph.
+
+    Vertices are assigned integer indices in the order networkx iterates
+    them, and edges are stored as parallel arrays of source indices,
+    target indices and weights in the order of graph.edges. Per-vertex
+    statistics are computed once, in a single batched pass, and are
+    aligned to the vertex index.
+    """
+
+    def __init__(self, graph: nx.Graph, weight: str = "weight") -> GraphArrays:
+        self.directed = graph.is_directed()
+        self.weight   = weight
+        self.nodes: List[Any]      = list(graph.nodes)
+        self.index: Dict[Any, int] = {v: i for (i, v) in enumerate(self.nodes)}
+
+        num_edges = graph.number_of_edges()
+
+        self.sources = np.fromiter(
+            (self.index[v] for (v, _) in graph.edges), dtype = np.int64, count = num_edges)
+        self.targets = np.fromiter(
+            (self.index[u] for (_, u) in graph.edges), dtype = np.int64, count = num_edges)
+        self.weights = np.fromiter(
+            (w for (_, _, w) in graph.edges(data = weight)), dtype = np.float64, count = num_edges)
+
+        self._adjacency:  Optional[csr_matrix] = None
+        self._edge_keys:  Optional[np.ndarray] = None
+        self._edge_order: Optional[np.ndarray] = None
+        self._compute_vertex_statistics()
+
+    def with_weights(self, weights: np.ndarray) -> GraphArrays:
+        """
+        A copy of these arrays for the same graph structure, but with the
+        given edge weights in place of the current ones.
+        """
+        arrays = copy(self)
+        arrays.weights    = weights
+        arrays._adjacency = None
+        arrays._compute_vertex_statistics()
+
+        return arrays
+
+    def order(self) -> int:
+        return len(self.nodes)
+
+    def size(self) -> int:
+        return len(self.weights)
+
+    def _compute_vertex_statistics(self) -> None:
+        n = self.order()
+
+        self.out_strengths = np.bincount(self.sources, weights = self.weights, minlength = n)
+        self.in_strengths  = np.bincount(self.targets, weights = self.weights, minlength = n)
+        self.out_degrees   = np.bincount(self.sources, minlength = n)
+        self.in_degrees    = np.bincount(self.targets, minlength = n)
+
+        if self.directed:
+            self.strengths = self.out_strengths
+            self.degrees   = self.out_degrees
+        else:
+            # In an undirected graph each edge counts towards both of its
+            # endpoints, except for self loops which networkx only lists
+            # once in the adjacency of their vertex.
+            not_loop = self.sources != self.targets
+
+            self.strengths = self.out_strengths + np.bincount(
+                self.targets[not_loop], weights = self.weights[not_loop], minlength = n)
+            self.degrees   = self.out_degrees + np.bincount(
+                self.targets[not_loop], minlength = n)
+
+            self.out_strengths = self.in_strengths = self.strengths
+            self.out_degrees   = self.in_degrees   = self.degrees
+
+    def adjacency(self) -> csr_matrix:
+        """
+        The weighted adjacency matrix of the graph in CSR form. For an
+        undirected graph the matrix is symmetric.
+        """
+        if self._adjacency is None:
+            n = self.order()
+
+            if self.directed:
+                rows, cols, data = self.sources, self.targets, self.weights
+            else:
+                not_loop = self.sources != self.targets
+                rows = np.concatenate([self.sources, self.targets[not_loop]])
+                cols = np.concatenate([self.targets, self.sources[not_loop]])
+                data = np.concatenate([self.weights, self.weights[not_loop]])
+
+            self._adjacency = csr_matrix((data, (rows, cols)), shape = (n, n))
+
+        return self._adjacency
+
+    def _keys(self, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        if not self.directed:
+            sources, targets = np.minimum(sources, targets), np.maximum(sources, targets)
+
+        return sources * self.order() + targets
+
+    def edge_ids(self, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        """
+        Find the positions in the edge arrays of the edges with the given
+        source and target vertex indices. In an undirected graph either
+        orientation of an edge may be given. Every queried edge must
+        be present in the graph.
+        """
+        if self._edge_keys is None:
+            keys = self._keys(self.sources, self.targets)
+
+            self._edge_order = np.argsort(keys, kind = "stable")
+            self._edge_keys  = keys[self._edge_order]
+
+        positions = np.searchsorted(self._edge_keys, self._keys(sources, targets))
+        return self._edge_order[positions]
@@ -0,0 +1,28 @@
+from typing import Tuple
+from weakref import WeakKeyDictionary
+
+import networkx as nx
+
+# The number of times each graph has been marked as changed, kept only for
+# as long as the graph is alive.
+_versions: WeakKeyDictionary = WeakKeyDictionary()
+
+def graph_version(graph: nx.Graph) -> Tuple[int, int, int]:
+    """
+    A key for the current state of a graph, for caches of values derived
+    from it to compare against the key they were built at. It changes
+    whenever the graph gains or loses vertices or edges, or is passed to
+    invalidate_graph.
+
+    Checking it costs O(1), so in-place changes to weights or scores, or
+    swapping one edge for another, aren't seen until invalidate_graph is
+    called. Backbone strategies do so whenever they write edge scores.
+    """
+    return (_versions.get(graph, 0), len(graph), graph.number_of_edges())
+
+def invalidate_graph(graph: nx.Graph) -> None:
+    """
+    Mark a graph as changed, so that every cache keyed on its graph_version
+    rebuilds on next use.
+    """
+    _versions[graph] = _versions.get(graph, 0) + 1
@@ -19,7 +19,7 @@ plot_builder      = PlotBuilder(visualisation)
 
 #     corrected_p_val = backbone_strategy.correct_p_value(graph, p_val)
 
-#     edges = [(v, u) for (v, u) in graph.edges if graph[v][u]["p"] < corrected_p_val]
+#     edges = [(v, u) for (v, u) in graph.edges if graph[v][u][backbone_strategy.attribute] < corrected_p_val]
 #     visualisation.set_edges_to_display(edges)
 
 #     plot_builder.redraw()
@@ -0,0 +1,2 @@
+# Tests import the packages in src directly, as the scripts alongside them
+# do. pytest puts the directory of this file on the path before collecting.
@@ -0,0 +1,89 @@
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import csv
+import os
+
+import networkx as nx
+import numpy    as np
+
+from data import (
+    get_graph_from_csv_adjacency_matrix,
+    get_edge_arrays_from_csv_adjacency_matrix,
+    random_correlation_matrix
+)
+
+sizes = [44, 71, 500, 1000]
+
+def row_by_row_loader(filename: str, directed: bool = False, vertex_name_row = True, absolute = False) -> nx.Graph:
+    """
+    The loader previously used by get_graph_from_csv_adjacency_matrix,
+    which parses and adds one cell at a time.
+    """
+    graph = nx.DiGraph() if directed else nx.Graph()
+
+    with open(filename) as csvfile:
+        reader       = csv.reader(csvfile)
+        vertex_names = next(reader) if vertex_name_row else None
+
+        for (row_index, row) in enumerate(reader):
+            for (col_index, col) in enumerate(row):
+                val = float(col)
+                if val != 0 and row_index != col_index:
+                    v = vertex_names[row_index] if vertex_name_row else row_index
+                    u = vertex_names[col_index] if vertex_name_row else col_index
+                    graph.add_edge(v, u, weight = abs(val) if absolute else val)
+
+    return graph
+
+def write_matrix(filename: str, n: int, seed: int = 0) -> None:
+    # Signed, asymmetric values with some zeros exercise every branch.
+    matrix = random_correlation_matrix(n, seed = seed) * np.random.default_rng(seed).choice([-1, 0, 1], size = (n, n))
+
+    with open(filename, "w", newline = "") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow([f"gene_{i}" for i in range(n)])
+        writer.writerows(matrix.tolist())
+
+def time_loader(loader, filename: str, **kwargs) -> tuple:
+    start = perf_counter()
+    graph = loader(filename, **kwargs)
+    return perf_counter() - start, graph
+
+def same_graph(g: nx.Graph, h: nx.Graph) -> bool:
+    return list(g.nodes) == list(h.nodes) and list(g.edges(data = "weight")) == list(h.edges(data = "weight"))
+
+print(f"{'vertices':>10} {'row by row':>12} {'graph':>12} {'speedup':>10} {'arrays':>12} {'speedup':>10} {'cached':>12} {'speedup':>10}")
+
+with TemporaryDirectory() as directory:
+    for n in sizes:
+        filename = os.path.join(directory, f"matrix_{n}.csv")
+        write_matrix(filename, n)
+
+        for options in [{}, {"absolute": True}, {"directed": True}, {"vertex_name_row": False}]:
+            if not options.get("vertex_name_row", True):
+                # Drop the header so the file is just the matrix.
+                with open(filename) as source, open(filename + ".raw", "w") as target:
+                    next(source)
+                    target.writelines(source)
+
+            path = filename + ".raw" if not options.get("vertex_name_row", True) else filename
+
+            _, expected = time_loader(row_by_row_loader, path, **options)
+            _, actual   = time_loader(get_graph_from_csv_adjacency_matrix, path, cache = False, **options)
+            assert same_graph(expected, actual), (n, options)
+
+            # Once to fill the cache and once to read from it.
+            for _ in range(2):
+                _, cached = time_loader(get_graph_from_csv_adjacency_matrix, path, **options)
+                assert same_graph(expected, cached), (n, options)
+
+        old_time,    _ = time_loader(row_by_row_loader, filename, absolute = True)
+        graph_time,  _ = time_loader(get_graph_from_csv_adjacency_matrix, filename, absolute = True, cache = False)
+        arrays_time, _ = time_loader(get_edge_arrays_from_csv_adjacency_matrix, filename, absolute = True, cache = False)
+        cached_time, _ = time_loader(get_edge_arrays_from_csv_adjacency_matrix, filename, absolute = True)
+
+        print(
+            f"{n:>10} {old_time:>11.3f}s {graph_time:>11.3f}s {old_time / graph_time:>9.1f}x"
+            f" {arrays_time:>11.3f}s {old_time / arrays_time:>9.1f}x"
+            f" {cached_time:>11.3f}s {old_time / cached_time:>9.1f}x"
+        )
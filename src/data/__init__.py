@@ -1,13 +1,15 @@
 from .starch                       import get_starch_grain_dataset, construct_starch_grain_network, StarchGrain
-from .us_airport                   import get_us_airport_network, get_us_airport_locations, get_undefined_airports
-from .us_airport_data_provider     import USAirportDataProvider
-from .csv_adjacency                import get_graph_from_csv_adjacency_matrix
-from .csv_clustering               import get_clusters_from_csv, get_multiple_clusterings_from_csv
-from .csv_edge_list                import get_graph_from_csv_edge_list
+from .us_airport                   import get_us_airport_network, get_us_airport_locations, get_undefined_airports, stream_us_airport_network, get_us_airport_networks, RouteTotals
+from .us_airport_data_provider     import USAirportDataProvider, get_us_airport_data_providers
+from .csv_adjacency                import get_graph_from_csv_adjacency_matrix, get_edge_arrays_from_csv_adjacency_matrix, read_csv_adjacency_matrix
+from .csv_clustering               import get_clusters_from_csv, get_multiple_clusterings_from_csv, get_clustering_set_from_csv
+from .csv_edge_list                import get_graph_from_csv_edge_list, get_edge_arrays_from_csv_edge_list
 from .csv_writer                   import write_adjacency_matrix_to_csv
+from .graph_cache                  import load_edge_arrays, cache_path
+from .edge_arrays                  import graph_from_edge_arrays
 from .data_provider                import DataProvider
 from .genetic_data_provider        import GeneticDataProvider
 from .comms_data_provider          import CommunicationsDataProvider
 from .misc_data_provider           import MiscDataProvider
-from .random_genetic_data          import create_random_complete_graph
+from .random_genetic_data          import create_random_complete_graph, random_correlation_matrix, random_correlation_tensor, random_correlation_edges
 from .random_genetic_data_provider import RandomGeneticDataProvider
\ No newline at end of file
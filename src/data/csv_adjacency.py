@@ -1,45 +1,134 @@
 import csv
+from typing import List, Optional, Tuple
 
-import networkx as nx
+import numpy    as np
+import pandas   as pd
 
-def get_graph_from_csv_adjacency_matrix(filename: str, directed: bool = False, vertex_name_row = True, absolute = False):
-    graph = None
-    if directed:
-        graph = nx.DiGraph()
-    else:
-        graph = nx.Graph()
-        
-    with open(filename) as csvfile:
-        reader = csv.reader(csvfile)
-        row_index = 0
+from .edge_arrays import EdgeArrays, deduplicate_edges, graph_from_edge_arrays
+from .graph_cache import load_edge_arrays
+
+def read_csv_adjacency_matrix(filename: str, vertex_name_row: bool = True) -> Tuple[Optional[List[str]], np.ndarray]:
+    """
+    Read an adjacency matrix from a csv file into a dense float array in a
+    single pass of pandas' C parser, along with the vertex names from its
+    first row if it has one.
+    """
+    vertex_names = None
 
+    with open(filename, newline = "") as csvfile:
         if vertex_name_row:
-            vertex_names = next(reader)
-            for row in reader:
-                col_index = 0
-                for col in row:
-                    val = float(col)
-                    if val != 0 and row_index != col_index:
-                        if absolute:
-                            graph.add_edge(vertex_names[row_index], vertex_names[col_index], weight = abs(val))
-                        else:
-                            graph.add_edge(vertex_names[row_index], vertex_names[col_index], weight = val)
-
-
-                    col_index += 1
-                row_index += 1
-        else:
-            for row in reader:
-                col_index = 0
-                for col in row:
-                    val = float(col)
-                    if val != 0 and row_index != col_index:
-                        if absolute:
-                            graph.add_edge(row_index, col_index, weight = abs(val))
-                        else:
-                            graph.add_edge(row_index, col_index, weight = val)
-
-                    col_index += 1
-                row_index += 1
-
-    return graph
\ No newline at end of file
+            vertex_names = next(csv.reader([csvfile.readline()]))
+
+        matrix = pd.read_csv(csvfile, header = None, dtype = np.float64, engine = "c", float_precision = "round_trip").to_numpy()
+
+    return vertex_names, matrix
+
+def _first_cells(matrix: np.ndarray, directed: bool) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find the cells of a square adjacency matrix that add a new edge when
+    read row by row, with the weight each edge ends up with.
+    """
+    kept = matrix != 0
+    np.fill_diagonal(kept, False)
+
+    # A cell below the diagonal only repeats an undirected edge if the cell
+    # above the diagonal, which is read first, was kept too.
+    if not directed:
+        kept &= ~np.tril(kept.T, -1)
+
+    rows, cols = np.nonzero(kept)
+    weights    = matrix[rows, cols]
+
+    # The cell read last sets the weight of an undirected edge.
+    if not directed:
+        transposed = matrix[cols, rows]
+        weights    = np.where((rows < cols) & (transposed != 0), transposed, weights)
+
+    return rows, cols, weights
+
+def _deduplicated_cells(
+    matrix:   np.ndarray,
+    codes:    np.ndarray,
+    directed: bool
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    As _first_cells, for matrices whose rows and columns are mapped to
+    vertices by codes, where several rows may share a vertex.
+    """
+    rows, cols = np.nonzero(matrix)
+    keep       = rows != cols
+    rows, cols = rows[keep], cols[keep]
+
+    return deduplicate_edges(codes[rows], codes[cols], matrix[rows, cols], directed)
+
+def adjacency_matrix_to_edge_arrays(
+    matrix:       np.ndarray,
+    vertex_names: Optional[List] = None,
+    directed:     bool           = False,
+    absolute:     bool           = False
+) -> EdgeArrays:
+    """
+    Turn a dense adjacency matrix into a list of vertices and arrays of
+    edge sources, targets and weights, ignoring zeros and the diagonal.
+
+    Vertices are named by vertex_names, or by their row index if not given,
+    and are listed in the order the matrix first mentions them when read
+    row by row. Each edge appears once, in the order it is first mentioned;
+    an undirected edge whose two cells differ takes its weight from the cell
+    read last, just as adding the cells to a networkx graph one at a time
+    would.
+    """
+    labels = list(range(max(matrix.shape))) if vertex_names is None else vertex_names
+    codes  = {}
+    for label in labels:
+        codes.setdefault(label, len(codes))
+
+    unique_labels = list(codes.keys())
+
+    if matrix.shape[0] == matrix.shape[1] and len(unique_labels) == len(labels):
+        sources, targets, weights = _first_cells(matrix, directed)
+    else:
+        # Rows with the same name are the same vertex.
+        label_codes = np.array([codes[label] for label in labels], dtype = np.int64)
+        sources, targets, weights = _deduplicated_cells(matrix, label_codes, directed)
+
+    if absolute:
+        weights = np.abs(weights)
+
+    # Renumber the vertices in the order they are first mentioned.
+    mentions     = np.stack([sources, targets], axis = 1).ravel()
+    _, first     = np.unique(mentions, return_index = True)
+    vertex_order = mentions[np.sort(first)]
+    renumbering  = np.empty(len(unique_labels), dtype = np.int64)
+    renumbering[vertex_order] = np.arange(len(vertex_order))
+
+    nodes = [unique_labels[c] for c in vertex_order.tolist()]
+
+    return nodes, renumbering[sources], renumbering[targets], weights
+
+def get_edge_arrays_from_csv_adjacency_matrix(
+    filename:        str,
+    directed:        bool = False,
+    vertex_name_row: bool = True,
+    absolute:        bool = False,
+    cache:           bool = True
+) -> EdgeArrays:
+    """
+    Load the edge arrays of a csv adjacency matrix, from the graph cache if
+    the file has been loaded with the same options since it last changed.
+    """
+    def parse() -> EdgeArrays:
+        vertex_names, matrix = read_csv_adjacency_matrix(filename, vertex_name_row)
+        return adjacency_matrix_to_edge_arrays(matrix, vertex_names, directed, absolute)
+
+    options = {"directed": directed, "vertex_name_row": vertex_name_row, "absolute": absolute}
+    return load_edge_arrays(filename, "csv_adjacency", options, parse, cache)
+
+def get_graph_from_csv_adjacency_matrix(filename: str, directed: bool = False, vertex_name_row = True, absolute = False, cache = True):
+    """
+    Load a graph from a csv adjacency matrix, with an edge for every
+    non-zero cell off the diagonal. The first row names the vertices if
+    vertex_name_row is set, otherwise vertices are numbered by row.
+    """
+    edges = get_edge_arrays_from_csv_adjacency_matrix(filename, directed, vertex_name_row, absolute, cache)
+    return graph_from_edge_arrays(*edges, directed = directed)
\ No newline at end of file
@@ -1,7 +1,9 @@
 import csv
 from typing import Dict, List
 
-from common import Clustering
+import numpy as np
+
+from common import Clustering, ClusteringSet
 
 def get_clusters_from_csv(filename: str, vertex_col: str, cluster_col: str) -> Clustering:
     """
@@ -29,6 +31,34 @@ def get_clusters_from_csv(filename: str, vertex_col: str, cluster_col: str) -> C
 
     return Clustering(clusters)
 
+def get_clustering_set_from_csv(filename: str, vertex_col: str, cluster_cols: List[str]) -> ClusteringSet:
+    """
+    Load a collection of clusterings from a csv file, where each vertex and its associated clusters
+    are contained in a distinct row, reading the file only once.
+
+    The column containing the vertex name is given by vertex_col, and the columns containing
+    the different clusterings are given in the cluster_cols list.
+
+    Return a ClusteringSet.
+    """
+    vertices = []
+    rows     = []
+    codes    = [{} for _ in cluster_cols]
+
+    with open(filename) as csvfile:
+        reader = csv.DictReader(csvfile)
+
+        for row in reader:
+            vertices.append(row[vertex_col])
+            rows.append([
+                codes[j].setdefault(row[cluster_col], len(codes[j]))
+                for (j, cluster_col) in enumerate(cluster_cols)
+            ])
+
+    labels = np.array(rows, dtype = np.int64).reshape(len(vertices), len(cluster_cols))
+
+    return ClusteringSet(vertices, list(cluster_cols), labels, [list(c.keys()) for c in codes])
+
 def get_multiple_clusterings_from_csv(filename: str, vertex_col: str, cluster_cols: List[str]) -> Dict[str, Clustering]:
     """
     Load a collection of clusterings from a csv file, where each vertex and its associated clusters
@@ -39,8 +69,4 @@ def get_multiple_clusterings_from_csv(filename: str, vertex_col: str, cluster_co
 
     Return a dict of Clustering objects.
     """
-    clusterings = {}
-    for cluster_col in cluster_cols:
-        clusterings[cluster_col] = get_clusters_from_csv(filename, vertex_col, cluster_col)
-
-    return clusterings
+    return get_clustering_set_from_csv(filename, vertex_col, cluster_cols).get_clusterings()
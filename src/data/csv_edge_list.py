@@ -1,28 +1,41 @@
 import csv
 
-import networkx as nx
-
-def get_graph_from_csv_edge_list(filename: str, directed: bool = False, absolute = False):
-    graph = None
-    if directed:
-        graph = nx.DiGraph()
-    else:
-        graph = nx.Graph()
-        
+import numpy as np
+
+from .edge_arrays import EdgeArrays, edge_arrays_from_pairs, graph_from_edge_arrays
+from .graph_cache import load_edge_arrays
+
+def read_csv_edge_list(filename: str, directed: bool = False, absolute: bool = False) -> EdgeArrays:
+    """
+    Read the edges of a csv edge list of source, target and integer weight
+    rows, up to the first row that isn't one.
+    """
+    pairs   = []
+    weights = []
+
     with open(filename) as csvfile:
         reader = csv.reader(csvfile)
 
         for row in reader:
             if len(row) == 3:
-                start = row[0].strip()
-                end   = row[1].strip()
                 value = int(float(row[2].strip()))
 
-                if absolute:
-                    value = abs(value)
-
-                graph.add_edge(start, end, weight = value)
+                pairs.append((row[0].strip(), row[1].strip()))
+                weights.append(abs(value) if absolute else value)
             else:
                 break
 
-    return graph
\ No newline at end of file
+    return edge_arrays_from_pairs(pairs, np.array(weights, dtype = np.int64), directed)
+
+def get_edge_arrays_from_csv_edge_list(
+    filename: str,
+    directed: bool = False,
+    absolute: bool = False,
+    cache:    bool = True
+) -> EdgeArrays:
+    options = {"directed": directed, "absolute": absolute}
+    return load_edge_arrays(filename, "csv_edge_list", options, lambda: read_csv_edge_list(filename, directed, absolute), cache)
+
+def get_graph_from_csv_edge_list(filename: str, directed: bool = False, absolute = False, cache = True):
+    edges = get_edge_arrays_from_csv_edge_list(filename, directed, absolute, cache)
+    return graph_from_edge_arrays(*edges, directed = directed)
\ No newline at end of file
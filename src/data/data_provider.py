@@ -5,7 +5,7 @@ from typing import Any, Tuple, Dict, List, Optional
 
 import networkx as nx
 
-from backbones import BackboneStrategy
+from backbones import BackboneStrategy, BackboneResult
 from common import Clustering
 
 @dataclass
@@ -36,4 +36,11 @@ class DataProvider(ABC):
     @abstractmethod
     def apply_backbone_strategy(self, backbone: BackboneStrategy) -> None:
         pass
+
+    def get_backbone_result(self, backbone: BackboneStrategy) -> BackboneResult:
+        """
+        Score the edges of the current graph with the given strategy,
+        without writing the scores into the graph.
+        """
+        return backbone.extract_backbone_result(self.get_graph())
     
\ No newline at end of file
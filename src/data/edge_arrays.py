@@ -0,0 +1,64 @@
+from typing import Any, Iterable, List, Tuple
+
+import networkx as nx
+import numpy    as np
+
+# A graph as its list of vertices and arrays of edge sources, targets (as
+# indices into the vertex list) and weights.
+EdgeArrays = Tuple[List[Any], np.ndarray, np.ndarray, np.ndarray]
+
+def deduplicate_edges(
+    sources:  np.ndarray,
+    targets:  np.ndarray,
+    weights:  np.ndarray,
+    directed: bool
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Reduce a sequence of edge additions to the edges they leave behind,
+    as adding them to a networkx graph one at a time would: each edge is
+    kept in the position it was first added, with the weight it was last
+    given.
+    """
+    n = max(sources.max(initial = -1), targets.max(initial = -1)) + 1
+
+    if directed:
+        keys = sources * n + targets
+    else:
+        keys = np.minimum(sources, targets) * n + np.maximum(sources, targets)
+
+    _, first        = np.unique(keys, return_index = True)
+    _, last_flipped = np.unique(keys[::-1], return_index = True)
+    last            = len(keys) - 1 - last_flipped
+
+    order = np.argsort(first, kind = "stable")
+    first, last = first[order], last[order]
+
+    return sources[first], targets[first], weights[last]
+
+def edge_arrays_from_pairs(pairs: Iterable[Tuple[Any, Any]], weights: np.ndarray, directed: bool) -> EdgeArrays:
+    """
+    Build edge arrays from a sequence of (source, target) vertex pairs and
+    their weights, with vertices listed in the order they are first
+    mentioned.
+    """
+    codes   = {}
+    indices = [(codes.setdefault(v, len(codes)), codes.setdefault(u, len(codes))) for (v, u) in pairs]
+    indices = np.array(indices, dtype = np.int64).reshape(len(indices), 2)
+
+    sources, targets, weights = deduplicate_edges(indices[:, 0], indices[:, 1], np.asarray(weights), directed)
+    return list(codes.keys()), sources, targets, weights
+
+def graph_from_edge_arrays(
+    nodes:    List[Any],
+    sources:  np.ndarray,
+    targets:  np.ndarray,
+    weights:  np.ndarray,
+    directed: bool = False
+) -> nx.Graph:
+    graph = nx.DiGraph() if directed else nx.Graph()
+    graph.add_nodes_from(nodes)
+    graph.add_weighted_edges_from(
+        (nodes[v], nodes[u], w) for (v, u, w) in zip(sources.tolist(), targets.tolist(), weights.tolist())
+    )
+
+    return graph
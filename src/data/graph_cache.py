@@ -0,0 +1,103 @@
+from typing import Any, Callable, Dict, Optional
+import hashlib
+import json
+import os
+import zipfile
+
+import numpy as np
+
+from .edge_arrays import EdgeArrays
+
+"""
+A cache of parsed graphs, stored as uncompressed .npz files next to their
+source files so that loading a graph again is a read of its edge arrays
+rather than a parse of the source.
+"""
+
+CACHE_SUFFIX  = ".cache.npz"
+CACHE_VERSION = 1
+
+def cache_path(filename: str, loader: str, options: Dict[str, Any]) -> str:
+    """
+    The cache file for a file loaded by a loader with the given options,
+    named after both so that loading one file in several ways keeps one
+    cache for each.
+    """
+    digest = hashlib.blake2b(json.dumps([loader, options], sort_keys = True).encode(), digest_size = 4).hexdigest()
+    return f"{filename}.{digest}{CACHE_SUFFIX}"
+
+def cache_key(filename: str, loader: str, options: Dict[str, Any]) -> str:
+    """
+    Identify a parse of a file by the file's path, size and modification
+    time along with the loader and the options it was given, so that a
+    cached parse is only used if none of them have changed.
+    """
+    stat = os.stat(filename)
+
+    return json.dumps({
+        "version":  CACHE_VERSION,
+        "path":     os.path.abspath(filename),
+        "size":     stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "loader":   loader,
+        "options":  options
+    }, sort_keys = True)
+
+def read_cached_edge_arrays(path: str, key: str) -> Optional[EdgeArrays]:
+    try:
+        with np.load(path, allow_pickle = False) as cached:
+            if str(cached["key"]) != key:
+                return None
+
+            return cached["nodes"].tolist(), cached["sources"], cached["targets"], cached["weights"]
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+        return None
+
+def write_cached_edge_arrays(path: str, key: str, edges: EdgeArrays) -> None:
+    nodes, sources, targets, weights = edges
+    temporary = f"{path}.{os.getpid()}.tmp"
+
+    try:
+        with open(temporary, "wb") as cache_file:
+            np.savez(cache_file,
+                key     = np.array(key),
+                nodes   = np.array(nodes),
+                sources = sources,
+                targets = targets,
+                weights = weights
+            )
+
+        # Replace any existing cache in one step, so that a concurrent
+        # reader never sees a partly written file.
+        os.replace(temporary, path)
+    except (OSError, ValueError):
+        # Caching is only an optimisation, so a read-only directory or
+        # vertices that can't be stored without pickling just mean parsing
+        # again next time.
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+def load_edge_arrays(
+    filename: str,
+    loader:   str,
+    options:  Dict[str, Any],
+    parse:    Callable[[], EdgeArrays],
+    cache:    bool = True
+) -> EdgeArrays:
+    """
+    Get the edge arrays of a file from its cache if they have been cached
+    by the same loader with the same options since the file last changed,
+    otherwise parse the file and cache the result.
+    """
+    if not cache:
+        return parse()
+
+    path  = cache_path(filename, loader, options)
+    key   = cache_key(filename, loader, options)
+    edges = read_cached_edge_arrays(path, key)
+
+    if edges is None:
+        edges = parse()
+        write_cached_edge_arrays(path, key, edges)
+
+    return edges
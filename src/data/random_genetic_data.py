@@ -1,49 +1,60 @@
-from math import sqrt
-import random
-from typing import Optional, List, Tuple
-from statistics import mean
+from typing import Optional, Tuple
 
 import networkx as nx
+import numpy    as np
 
 # By the central limit theorem, the sum of independent random variables
 # approximates a normal distribution.
-def get_random_normal(n: int = 3) -> float:
-    return sum([random.uniform(0, 1 / n) for _ in range(n)])
-
-def correlation(
-    v: Tuple[float, float, float, float, float],
-    u: Tuple[float, float, float, float, float]
-) -> float:
-    v_mean = mean(v)
-    u_mean = mean(u)
-
-    c_v = [v_i - v_mean for v_i in v]
-    c_u = [u_i - u_mean for u_i in u]
-
-    numerator   = sum([c_v[i] * c_u[i] for i in range(5)])
-    denominator = sqrt(sum([pow(c_v_i, 2) for c_v_i in c_v]) * sum([pow(c_u_i, 2) for c_u_i in c_u]))
-
-    return abs(numerator / denominator)
-
-def generate_vertex() -> Tuple[float, float, float, float, float]:
-    return tuple([get_random_normal() for _ in range(5)])
-
-def generate_vertices(n: int) -> List[Tuple[float, float, float, float, float]]:
-    return [generate_vertex() for v in range(n)]
-
-def create_random_complete_graph(n: int, seed: Optional[int] = None) -> nx.Graph:
-    if seed is not None:
-        random.seed(seed)
-
-    tuples = generate_vertices(n)
+def random_profiles(n: int, d: int = 5, rng: Optional[np.random.Generator] = None, terms: int = 3) -> np.ndarray:
+    """
+    Draw an n by d matrix of random expression profiles, each value the sum
+    of terms uniform values in [0, 1 / terms).
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+
+    return rng.uniform(0, 1 / terms, size = (n, d, terms)).sum(axis = 2)
+
+def random_correlation_matrix(n: int, d: int = 5, seed: Optional[int] = None) -> np.ndarray:
+    """
+    The absolute Pearson correlation between every pair of n random profiles
+    of d samples each, as a dense n by n matrix with a zero diagonal.
+    """
+    correlations = np.abs(np.corrcoef(random_profiles(n, d, np.random.default_rng(seed))))
+    np.fill_diagonal(correlations, 0)
+
+    return correlations
+
+def random_correlation_tensor(r: int, n: int, d: int = 5, seed: Optional[int] = None) -> np.ndarray:
+    """
+    The absolute correlation matrices of r independent sets of n random
+    profiles, stacked into an (r, n, n) array with zero diagonals. Each
+    matrix is distributed exactly as one from random_correlation_matrix.
+    """
+    profiles = random_profiles(r * n, d, np.random.default_rng(seed)).reshape(r, n, d)
+
+    centred      = profiles - profiles.mean(axis = 2, keepdims = True)
+    centred     /= np.linalg.norm(centred, axis = 2, keepdims = True)
+    correlations = np.abs(np.einsum("rid,rjd->rij", centred, centred))
+
+    diagonal = np.arange(n)
+    correlations[:, diagonal, diagonal] = 0
+
+    return np.clip(correlations, 0, 1)
+
+def random_correlation_edges(n: int, d: int = 5, seed: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The edges of the complete graph on n random profiles, as arrays of
+    sources, targets and absolute correlations with sources < targets.
+    """
+    sources, targets = np.triu_indices(n, k = 1)
+    return sources, targets, random_correlation_matrix(n, d, seed)[sources, targets]
+
+def create_random_complete_graph(n: int, seed: Optional[int] = None, d: int = 5) -> nx.Graph:
+    sources, targets, weights = random_correlation_edges(n, d, seed)
 
     graph = nx.Graph()
-    graph.add_nodes_from([v for v in range(n)])
-
-    i = 0
-    for v in range(n):
-        for u in range(v + 1, n):
-            graph.add_edge(v, u, weight = correlation(tuples[v], tuples[u]))
-            i = i + 1
+    graph.add_nodes_from(range(n))
+    graph.add_weighted_edges_from(zip(sources.tolist(), targets.tolist(), weights.tolist()))
 
     return graph
@@ -1,9 +1,37 @@
 from __future__ import annotations
+from typing import Optional
 
+import networkx as nx
+
+from backbones import BackboneResult, BackboneStrategy
+
+from .edge_arrays import graph_from_edge_arrays
 from .genetic_data_provider import GeneticDataProvider
-from .random_genetic_data import create_random_complete_graph
+from .random_genetic_data import random_correlation_edges
 
 class RandomGeneticDataProvider(GeneticDataProvider):
-    def __init__(self, n = 71) -> RandomGeneticDataProvider:
-        self.graph = create_random_complete_graph(n)
-        self.names = [v for v in range(n)]
+    """
+    The complete graph on n random expression profiles, held as edge
+    arrays. The networkx graph is only built once it is asked for, so a
+    backbone result taken with get_backbone_result before then leaves only
+    arrays alive.
+    """
+
+    def __init__(self, n = 71, seed: Optional[int] = None, d: int = 5) -> RandomGeneticDataProvider:
+        self.edges  = random_correlation_edges(n, d, seed)
+        self.names  = [v for v in range(n)]
+        self._graph: Optional[nx.Graph] = None
+
+    def _build_graph(self) -> nx.Graph:
+        return graph_from_edge_arrays(self.names, *self.edges)
+
+    @property
+    def graph(self) -> nx.Graph:
+        if self._graph is None:
+            self._graph = self._build_graph()
+
+        return self._graph
+
+    def get_backbone_result(self, backbone: BackboneStrategy) -> BackboneResult:
+        graph = self._graph if self._graph is not None else self._build_graph()
+        return backbone.extract_backbone_result(graph)
\ No newline at end of file
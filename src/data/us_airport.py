@@ -1,14 +1,55 @@
-from typing import List, Dict, Tuple, Set
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Dict, Optional, Tuple, Set
 from itertools import chain
 from os import path
 
+import numpy    as np
 import pandas   as pd
 import networkx as nx
 
+from .edge_arrays import EdgeArrays, edge_arrays_from_pairs, graph_from_edge_arrays
+from .graph_cache import load_edge_arrays
 
 
+
+# The rows of raw passenger data read at a time when streaming.
+CHUNK_SIZE = 1 << 20
+
+def get_us_airport_dataset_filename(year: int) -> str:
+    return f"./resources/us_airport_{year}.csv"
+
 def get_us_airport_dataset(year: int) -> pd.DataFrame:
-    return pd.read_csv(f"./resources/us_airport_{year}.csv")
+    return pd.read_csv(get_us_airport_dataset_filename(year))
+
+def stream_us_airport_dataset(
+    year:       int,
+    chunk_size: int                     = CHUNK_SIZE,
+    months:     Optional[Iterable[int]] = None
+) -> Iterable[pd.DataFrame]:
+    """
+    Read a year of raw passenger data in chunks of chunk_size rows, keeping
+    only the columns needed to build the network in compact types. If
+    months are given, only flights in those months are kept.
+    """
+    columns = ["ORIGIN", "DEST", "PASSENGERS"] + (["MONTH"] if months is not None else [])
+    dtypes  = {"ORIGIN": "category", "DEST": "category", "PASSENGERS": np.float64, "MONTH": np.int8}
+
+    # Materialised once, as the filter is applied to every chunk.
+    if months is not None:
+        months = list(months)
+
+    with pd.read_csv(
+        get_us_airport_dataset_filename(year),
+        usecols   = columns,
+        dtype     = {c: dtypes[c] for c in columns},
+        chunksize = chunk_size
+    ) as reader:
+        for chunk in reader:
+            if months is not None:
+                chunk = chunk[chunk["MONTH"].isin(months)]
+
+            yield chunk
 
 def get_us_airport_index(filename: str = "./resources/us_airports.csv") -> pd.DataFrame:
     return pd.read_csv(filename)
@@ -43,67 +84,155 @@ def get_us_airport_locations(filename: str = "./resources/us_airport_locations.c
 
         return locations
 
-def construct_us_airport_network(dataset: pd.DataFrame, index: pd.DataFrame) -> nx.Graph:
-    links:     Dict[Tuple[str, str], int]     = {}
-    airports = get_us_airport_locations().keys()
-    num_rows = len(dataset)
+def construct_us_airport_network(
+    dataset:   pd.DataFrame,
+    index:     pd.DataFrame,
+    locations: Optional[Dict[str, Tuple[float, float]]] = None
+) -> nx.Graph:
+    """
+    Build the network of passenger flights between airports with a known
+    location, weighting each route by the passengers flown along it in
+    either direction. Routes are added in the order they first appear in
+    the dataset. The locations are read with get_us_airport_locations
+    unless given.
+    """
+    if locations is None:
+        locations = get_us_airport_locations()
+
+    airports = list(locations.keys())
     print("Generating Airport Network")
 
-    for i, row in dataset.iterrows():
-        origin      = row["ORIGIN"]
-        destination = row["DEST"]
-        passengers  = row["PASSENGERS"]
-
-        if i % 10000 == 0 and i > 0:
-            print(f"{i} / {num_rows}")
+    known   = dataset["ORIGIN"].isin(airports) & dataset["DEST"].isin(airports)
+    flights = dataset.loc[known & (dataset["PASSENGERS"] != 0)]
 
-        if passengers == 0:
-            continue
+    # Both directions of a route are grouped under the same pair.
+    swap   = flights["ORIGIN"] > flights["DEST"]
+    first  = flights["ORIGIN"].where(~swap, flights["DEST"])
+    second = flights["DEST"].where(~swap, flights["ORIGIN"])
+    links  = flights["PASSENGERS"].groupby([first, second], sort = False).sum()
 
-        if not origin in airports or not destination in airports:
-            continue
-
-        if (origin, destination) in links.keys():
-            links[origin, destination] = links[origin, destination] + passengers
-        elif (destination, origin) in links.keys():
-            links[destination, origin] = links[destination, origin] + passengers
-        else:
-            links[origin, destination] = passengers
-            
-    airports = set(chain(*links.keys()))
+    airports = set(chain(*links.index))
 
     network = nx.Graph()
     network.add_nodes_from(airports)
-    
-    for ((origin, destination), weight) in links.items():
-        network.add_edge(origin, destination, weight = weight)
+    network.add_weighted_edges_from((origin, destination, weight) for ((origin, destination), weight) in links.items())
 
     return network
 
-def load_us_airport_network(year: int) -> Tuple[nx.Graph, Dict[Tuple[str, str], int]]:
-    network_df = pd.read_csv(f"./resources/us_airport_network_{year}.csv")
-    
-    network = nx.Graph()
-    
-    for i, row in network_df.iterrows():
-        origin      = row["origin"]
-        destination = row["destination"]
-        weight      = row["weight"]
-
-        network.add_edge(origin, destination, weight = weight)
+class RouteTotals():
+    """
+    The running total of passengers flown on each route between known
+    airports, in either direction, folded together one chunk of raw data
+    at a time so that memory grows with the number of routes rather than
+    the number of rows. Routes are kept in the order they first appear.
+    """
+
+    def __init__(self, airports: List[str]) -> RouteTotals:
+        # Locations files can have blank or repeated codes, which can't be
+        # looked up.
+        self.airports = pd.Index(airports).dropna().unique()
+
+        # Passengers by route, keyed on the codes of its two airports as
+        # lower * len(airports) + higher.
+        self.totals = pd.Series(dtype = np.int64, index = pd.Index([], dtype = np.int64))
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        origins      = self.airports.get_indexer(chunk["ORIGIN"]).astype(np.int64)
+        destinations = self.airports.get_indexer(chunk["DEST"]).astype(np.int64)
+        passengers   = chunk["PASSENGERS"].to_numpy(dtype = np.float64, na_value = np.nan)
+
+        # Rows missing a passenger count carry no passengers, like empty
+        # flights. Counts are whole numbers, read as floats by pandas.
+        passengers = np.rint(np.nan_to_num(passengers, nan = 0.0)).astype(np.int64)
+
+        # Unknown airports have code -1.
+        keep = (origins >= 0) & (destinations >= 0) & (passengers != 0)
+
+        keys   = np.minimum(origins, destinations) * len(self.airports) + np.maximum(origins, destinations)
+        totals = pd.Series(passengers[keep], index = keys[keep], dtype = np.int64)
+
+        self.totals = pd.concat([self.totals, totals]).groupby(level = 0, sort = False).sum()
+
+    def routes(self) -> List[Tuple[str, str]]:
+        keys = self.totals.index.to_numpy()
+        return list(zip(self.airports[keys // len(self.airports)], self.airports[keys % len(self.airports)]))
+
+    def to_network(self) -> nx.Graph:
+        """
+        The network of every route seen so far, built as
+        construct_us_airport_network would from the same rows.
+        """
+        routes = self.routes()
+
+        network = nx.Graph()
+        network.add_nodes_from(set(chain(*routes)))
+        network.add_weighted_edges_from(
+            (origin, destination, weight) for ((origin, destination), weight) in zip(routes, self.totals.astype(np.float64).tolist())
+        )
 
-    return network
-
-def get_us_airport_network(year: int) -> nx.Graph:
-    dataset = get_us_airport_dataset(year)
-    index   = get_us_airport_index()
+        return network
 
+def stream_us_airport_network(
+    year:       int,
+    chunk_size: int                                      = CHUNK_SIZE,
+    months:     Optional[Iterable[int]]                  = None,
+    locations:  Optional[Dict[str, Tuple[float, float]]] = None
+) -> nx.Graph:
+    """
+    Build the airport network of a year, or of the given months of it,
+    from its raw passenger data in chunks rather than all at once.
+    """
+    if locations is None:
+        locations = get_us_airport_locations()
+
+    totals = RouteTotals(list(locations.keys()))
+
+    for chunk in stream_us_airport_dataset(year, chunk_size, months):
+        totals.add(chunk)
+
+    return totals.to_network()
+
+def read_us_airport_network(filename: str) -> EdgeArrays:
+    network_df = pd.read_csv(filename)
+
+    pairs = zip(network_df["origin"].tolist(), network_df["destination"].tolist())
+    return edge_arrays_from_pairs(pairs, network_df["weight"].to_numpy(), False)
+
+def load_us_airport_network_file(filename: str, cache: bool = True) -> nx.Graph:
+    """
+    Load an airport network saved by get_us_airport_network, from the graph
+    cache if the file hasn't changed since it was last loaded.
+    """
+    edges = load_edge_arrays(filename, "us_airport_network", {}, lambda: read_us_airport_network(filename), cache)
+    return graph_from_edge_arrays(*edges)
+
+def load_us_airport_network(year: int) -> nx.Graph:
+    return load_us_airport_network_file(f"./resources/us_airport_network_{year}.csv")
+
+def get_us_airport_network(
+    year:       int,
+    chunk_size: Optional[int]                            = None,
+    index:      Optional[pd.DataFrame]                   = None,
+    locations:  Optional[Dict[str, Tuple[float, float]]] = None
+) -> nx.Graph:
+    """
+    Load the airport network of a year, building and saving it from the raw
+    passenger data if it hasn't been already. Given a chunk_size, the raw
+    data is streamed in chunks of that many rows rather than read at once.
+    The airport index and locations are read from their files unless
+    given.
+    """
     exists = path.isfile(f"./resources/us_airport_network_{year}.csv")
 
     if exists:
         return load_us_airport_network(year)
     else:
-        network = construct_us_airport_network(dataset, index)
+        if chunk_size is not None:
+            network = stream_us_airport_network(year, chunk_size, locations = locations)
+        else:
+            dataset = get_us_airport_dataset(year)
+            index   = get_us_airport_index() if index is None else index
+            network = construct_us_airport_network(dataset, index, locations)
 
         df_construction = {
             "origin":      list(u for u, v, w in network.edges(data = True)),
@@ -117,6 +246,57 @@ def get_us_airport_network(year: int) -> nx.Graph:
         
         return network
 
+# The airport index and locations each worker process builds networks
+# with, shipped to it once when the process pool starts.
+_worker_index:      Optional[pd.DataFrame]                   = None
+_worker_locations:  Optional[Dict[str, Tuple[float, float]]] = None
+_worker_chunk_size: Optional[int]                            = None
+
+def _initialise_worker(
+    index:      pd.DataFrame,
+    locations:  Dict[str, Tuple[float, float]],
+    chunk_size: Optional[int]
+) -> None:
+    global _worker_index, _worker_locations, _worker_chunk_size
+    _worker_index, _worker_locations, _worker_chunk_size = index, locations, chunk_size
+
+def _build_network(year: int) -> nx.Graph:
+    return get_us_airport_network(year, _worker_chunk_size, _worker_index, _worker_locations)
+
+def get_us_airport_networks(
+    years:      Iterable[int],
+    workers:    int           = 1,
+    chunk_size: Optional[int] = None
+) -> Dict[int, nx.Graph]:
+    """
+    Get the airport network of every year, as get_us_airport_network would,
+    keyed by year in the order given. Networks already saved are loaded
+    directly, and the rest are built in a pool of workers processes when
+    there is more than one, each year by a single worker. The airport index
+    and locations are read once and shared with every worker.
+    """
+    years   = list(dict.fromkeys(years))
+    missing = [y for y in years if not path.isfile(f"./resources/us_airport_network_{y}.csv")]
+
+    networks: Dict[int, nx.Graph] = {}
+
+    if missing:
+        index     = get_us_airport_index()
+        locations = get_us_airport_locations()
+
+        if workers > 1 and len(missing) > 1:
+            with ProcessPoolExecutor(
+                max_workers = min(workers, len(missing)),
+                initializer = _initialise_worker,
+                initargs    = (index, locations, chunk_size)
+            ) as executor:
+                networks.update(zip(missing, executor.map(_build_network, missing)))
+        else:
+            for year in missing:
+                networks[year] = get_us_airport_network(year, chunk_size, index, locations)
+
+    return {year: networks[year] if year in networks else load_us_airport_network(year) for year in years}
+
 def get_undefined_airports(year: int) -> List[str]:
     locations = get_us_airport_locations()
     network   = get_us_airport_network(year)
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Any, Tuple, Dict, List, Optional
+from typing import Any, Tuple, Dict, Iterable, List, Optional
 from math import cos, sin, pi, atan2
 from csv import DictReader
 
@@ -11,23 +11,13 @@ from common import Clustering, strength
 
 from .csv_adjacency import get_graph_from_csv_adjacency_matrix
 from .data_provider import DataProvider, Label
+from .us_airport import get_us_airport_networks, load_us_airport_network_file
 
 DATASET_FILE  = "./resources/us_airport_network_2006.csv"
 POSITION_FILE = "./resources/us_airport_locations.csv"
 
 def load_graph() -> nx.Graph:
-    network_df = pd.read_csv(DATASET_FILE)
-    
-    network = nx.Graph()
-    
-    for _, row in network_df.iterrows():
-        origin      = row["origin"]
-        destination = row["destination"]
-        weight      = row["weight"]
-
-        network.add_edge(origin, destination, weight = weight)
-
-    return network
+    return load_us_airport_network_file(DATASET_FILE)
 
 def load_locations() -> Dict[str, Tuple[float, float]]:
     df = pd.read_csv(POSITION_FILE)
@@ -40,9 +30,16 @@ def load_locations() -> Dict[str, Tuple[float, float]]:
     return locations
 
 class USAirportDataProvider(DataProvider):
-    def __init__(self) -> USAirportDataProvider:
-        self.graph     = load_graph()
-        self.positions = load_locations()
+    def __init__(self,
+        graph:     Optional[nx.Graph]                       = None,
+        positions: Optional[Dict[str, Tuple[float, float]]] = None
+    ) -> USAirportDataProvider:
+        """
+        Provide the given airport network, or the 2006 network by default,
+        with the given airport positions, or those in POSITION_FILE.
+        """
+        self.graph     = load_graph() if graph is None else graph
+        self.positions = load_locations() if positions is None else positions
 
     def get_graph(self) -> nx.Graph:
         return self.graph
@@ -63,4 +60,18 @@ class USAirportDataProvider(DataProvider):
 
     def apply_backbone_strategy(self, backbone: BackboneStrategy) -> None:
         backbone.extract_backbone(self.graph)
-    
\ No newline at end of file
+
+def get_us_airport_data_providers(
+    years:      Iterable[int],
+    workers:    int           = 1,
+    chunk_size: Optional[int] = None
+) -> Dict[int, USAirportDataProvider]:
+    """
+    A data provider for the airport network of every year, keyed by year,
+    with the networks built as by get_us_airport_networks and every provider
+    sharing the same positions.
+    """
+    positions = load_locations()
+    networks  = get_us_airport_networks(years, workers, chunk_size)
+
+    return {year: USAirportDataProvider(network, positions) for (year, network) in networks.items()}
@@ -1,4 +1,4 @@
-from statistics import mean, stdev
+from statistics import mean
 from typing import List, Optional, Tuple
 from math import pow, sqrt
 
@@ -10,10 +10,9 @@ from scipy.optimize import curve_fit
 from scipy.optimize.minpack import leastsq
 import scipy.stats
 
-from backbones import DisparityBackboneStrategy
-from backbones.backbone import BackboneStrategy
-from common.progress_bar import print_progress_bar
-from data      import GeneticDataProvider, RandomGeneticDataProvider, MiscDataProvider, genetic_data_provider
+from analysis  import NullModelEnsemble
+from backbones import DisparityBackboneStrategy, score_index
+from data      import GeneticDataProvider, MiscDataProvider, genetic_data_provider
 
 collapsed = True
 
@@ -37,10 +36,9 @@ ps = [p for p in np.linspace(0, 0.2, 50)]
 plot_xticks = np.linspace(0, 0.2, 11)
 
 backbones = 2
-random_backbones = []
 
 def plot_weights(graph, p = 0.1):
-    weights = [ graph[u][v]["weight"] for (u, v) in graph.edges if graph[u][v]["p"] < p]
+    weights = score_index(graph).weights_below(p)
 
     plot.hist(weights, 100)
     plot.show()
@@ -181,68 +179,29 @@ def fit_power_law(graph: nx.Graph, p: float = 0.1, should_plot = False, degree =
 def get_exponents(graph: nx.Graph, ps: List[float], degree = True) -> List[float]:
     return [fit_power_law(graph, p, degree = degree) for p in ps]
 
-def estimate_distribution(samples: List[float]) -> Tuple[float, float]:
-    average = mean(samples)
-    std_dev = stdev(samples, xbar = average)
-
-    return (average, std_dev)
-
 def plot_normal_distribution(average: float, std_dev: float) -> None:
     x = np.linspace(average - 5 * std_dev, average + 5 * std_dev, 100)
     y = scipy.stats.norm.pdf(x, average, std_dev)
 
     plot.plot(x, y)
 
-def get_random_backbone(strategy: BackboneStrategy) -> nx.Graph:
-    provider = RandomGeneticDataProvider(n = graph_n)
-    provider.apply_backbone_strategy(strategy)
-
-    return provider.get_graph()
-
-for i in range(backbones):
-    print_progress_bar(f"Computing backbone", i + 1, backbones)
-    random_backbones.append(get_random_backbone(backbone_strategy))
+# Every measure of the random backbones, summarised at each p without
+# keeping the backbones themselves.
+random_summary = NullModelEnsemble(backbone_strategy, ps, n = graph_n).run(backbones)
 
 def plot_sequence(degree = True):
-    real_exponents = get_exponents(genetic_graph, ps, degree)
-
-    random_exponents = []
-    for i in range(backbones):
-        print_progress_bar(f"Fitting power laws", i + 1, backbones)
-        
-        random_exponents.append(get_exponents(random_backbones[i], ps, degree))
-
-    mean_exponents = []
-    for (i, p) in enumerate(ps):
-        print_progress_bar(f"Averaging exponents", i + 1, len(ps))
-
-        exps = [e[i] for e in random_exponents if e[i] is not None]
-        if len(exps) > 0:
-            mean_exponents.append(mean(exps))
-        else:
-            mean_exponents.append(None)
-
-    diff = sum([1 for x in mean_exponents if x is None])
+    real_exponents = [np.nan if e is None else e for e in get_exponents(genetic_graph, ps, degree)]
 
-    yerr = []
-
-    for slice in range(diff, len(random_exponents[0])):
-        print_progress_bar(f"Estimating distributions", slice + 1 - diff, len(random_exponents[0]) - diff)
-
-        samples = [random_exponents[i][slice] for i in range(len(random_exponents)) if random_exponents[i][slice] is not None]
-        if len(samples) < 2:
-            yerr.append(0)
-        else:
-            average, std_dev = estimate_distribution(samples)
-            yerr.append(std_dev * 3)
-
-    m_exps = np.array(mean_exponents[diff:])
-    std_devs = np.array(yerr)
+    # Thresholds at which no random exponent could be fitted are left as
+    # gaps in the plot.
+    measure  = "degree_exponent" if degree else "strength_exponent"
+    m_exps   = random_summary.mean(measure)
+    std_devs = 3 * np.nan_to_num(random_summary.std(measure))
 
     plot.clf()
     # plot.subplot(2, 1, 1)
-    plot.plot(ps[diff:], mean_exponents[diff:])
-    plot.fill_between(ps[diff:], m_exps + std_devs, m_exps - std_devs, alpha = 0.2)
+    plot.plot(ps, m_exps)
+    plot.fill_between(ps, m_exps + std_devs, m_exps - std_devs, alpha = 0.2)
     plot.plot(ps, real_exponents)
 
     plot.title(f"Exponent of Power Law Fitted to {'Degree' if degree else 'Strength'} Sequence")
@@ -259,7 +218,10 @@ def plot_sequence(degree = True):
     # plot.subplot(2, 1, 2)
     plot.clf()
 
-    plot.hist([random_exponents[i][slice] for i in range(len(random_exponents))], 50)
+    # Evenly spaced quantiles of the random exponents are spread like the
+    # exponents themselves, so their histogram has the same shape.
+    quantiles = random_summary.quantiles(measure, np.linspace(0, 1, 101))[:, slice]
+    plot.hist(quantiles[~np.isnan(quantiles)], 50)
 
     y_min, y_max = plot.ylim()
 
@@ -276,28 +238,14 @@ def plot_sequence(degree = True):
 
     plot.show()
 
-def plot_graph_property(prop, name: str):
-    real_values   = [prop(genetic_graph, p) for p in ps]
-    random_values = [[] for _ in ps]
-    mean_values   = []
-    std_devs      = []
-
-    for (i, p) in enumerate(ps):
-        print_progress_bar(f"Computing {name}", i + 1, len(ps))
-
-        for backbone in random_backbones:
-            random_values[i].append(prop(backbone, p))
-
-        mean_value, std_dev = estimate_distribution(random_values[i])
-        mean_values.append(mean_value)
-        std_devs.append(3 * std_dev)
-
-    np_mean_values = np.array(mean_values)
-    np_std_devs    = np.array(std_devs)
+def plot_graph_property(prop, measure: str, name: str):
+    real_values    = [prop(genetic_graph, p) for p in ps]
+    np_mean_values = random_summary.mean(measure)
+    np_std_devs    = 3 * np.nan_to_num(random_summary.std(measure))
 
     plot.clf()
 
-    plot.plot(ps, mean_values)
+    plot.plot(ps, np_mean_values)
     plot.plot(ps, real_values)
     plot.fill_between(ps, np_mean_values + np_std_devs, np_mean_values - np_std_devs, alpha = 0.2)
 
@@ -322,9 +270,9 @@ fit_power_law(genetic_graph, p = 0.5,  should_plot = True, degree = False)
 plot_sequence(degree = True)
 plot_sequence(degree = False)
 
-plot_graph_property(size,                "Backbone Size")
-plot_graph_property(order,               "Backbone Order")
-plot_graph_property(total_strength,      "Backbone Total Strength")
-plot_graph_property(average_strength,    "Backbone Average Strength")
-plot_graph_property(average_degree,      "Backbone Average Degree")
-plot_graph_property(average_edge_weight, "Backbone Average Edge Weight")
+plot_graph_property(size,                "size",                "Backbone Size")
+plot_graph_property(order,               "order",               "Backbone Order")
+plot_graph_property(total_strength,      "total_strength",      "Backbone Total Strength")
+plot_graph_property(average_strength,    "average_strength",    "Backbone Average Strength")
+plot_graph_property(average_degree,      "average_degree",      "Backbone Average Degree")
+plot_graph_property(average_edge_weight, "average_edge_weight", "Backbone Average Edge Weight")
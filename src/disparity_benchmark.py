@@ -0,0 +1,39 @@
+from time import perf_counter
+import random
+
+import networkx as nx
+import numpy    as np
+
+from backbones import DisparityBackboneStrategy
+
+sizes = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+
+def random_weighted_graph(num_edges: int, seed: int = 0) -> nx.Graph:
+    random.seed(seed)
+
+    graph = nx.gnm_random_graph(num_edges // 10, num_edges, seed = seed)
+    for (v, u) in graph.edges:
+        graph[v][u]["weight"] = random.uniform(0, 1)
+
+    return graph
+
+def time_strategy(strategy: DisparityBackboneStrategy, graph: nx.Graph) -> float:
+    start = perf_counter()
+    strategy.extract_backbone(graph)
+    return perf_counter() - start
+
+def p_values(graph: nx.Graph) -> np.ndarray:
+    return np.array([graph[v][u]["p"] for (v, u) in graph.edges])
+
+print(f"{'edges':>10} {'iterative':>12} {'vectorized':>12} {'speedup':>10}")
+
+for num_edges in sizes:
+    iterative_graph  = random_weighted_graph(num_edges)
+    vectorized_graph = iterative_graph.copy()
+
+    iterative_time  = time_strategy(DisparityBackboneStrategy(vectorized = False), iterative_graph)
+    vectorized_time = time_strategy(DisparityBackboneStrategy(vectorized = True),  vectorized_graph)
+
+    assert np.allclose(p_values(iterative_graph), p_values(vectorized_graph))
+
+    print(f"{num_edges:>10} {iterative_time:>11.3f}s {vectorized_time:>11.3f}s {iterative_time / vectorized_time:>9.1f}x")
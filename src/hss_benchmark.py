@@ -0,0 +1,44 @@
+from time import perf_counter
+import random
+
+import networkx as nx
+import numpy    as np
+
+from backbones import HighSalienceSkeletonBackboneStrategy
+
+worker_counts = [1, 2, 4, 8]
+
+def random_weighted_graph(num_vertices: int, num_edges: int, seed: int = 0) -> nx.Graph:
+    random.seed(seed)
+
+    graph = nx.gnm_random_graph(num_vertices, num_edges, seed = seed)
+    for (v, u) in graph.edges:
+        graph[v][u]["weight"] = random.uniform(0, 1)
+
+    return graph
+
+def salience(graph: nx.Graph) -> np.ndarray:
+    return np.array([graph[v][u]["salience"] for (v, u) in graph.edges])
+
+if __name__ == "__main__":
+    graph = random_weighted_graph(2000, 20000)
+
+    serial_time     = None
+    serial_salience = None
+
+    print(f"{'workers':>8} {'time':>10} {'speedup':>10}")
+
+    for workers in worker_counts:
+        backbone = graph.copy()
+
+        start = perf_counter()
+        HighSalienceSkeletonBackboneStrategy(workers = workers).extract_backbone(backbone)
+        elapsed = perf_counter() - start
+
+        if serial_time is None:
+            serial_time     = elapsed
+            serial_salience = salience(backbone)
+
+        assert np.array_equal(serial_salience, salience(backbone))
+
+        print(f"{workers:>8} {elapsed:>9.3f}s {serial_time / elapsed:>9.1f}x")
@@ -4,8 +4,9 @@ import numpy             as np
 import networkx          as nx
 import matplotlib.pyplot as plt
 
-from backbones import DisparityBackboneStrategy
+from backbones import DisparityBackboneStrategy, score_index
 from data      import get_multiple_clusterings_from_csv, GeneticDataProvider
+from analysis  import intra_cluster_fractions
 
 collapsed = False
 
@@ -31,13 +32,7 @@ uncollapsed_clusterings   = get_multiple_clusterings_from_csv(uncollapsed_cluste
 ps = np.linspace(0, 0.5, 100)
 
 def get_remaining_edges(graph: nx.Graph, p: float = 0.1, attribute: str = "p") -> List[Tuple]:
-    remaining_edges = []
-
-    for (u, v) in graph.edges:
-        if graph[u][v][attribute] < p:
-            remaining_edges.append((u, v))
-
-    return remaining_edges
+    return score_index(graph, attribute).edges_below(p)
 
 # backbone_strategy = PolyaBackboneStrategy(a = 1, integer_weights = True)
 backbone_strategy = DisparityBackboneStrategy()
@@ -51,42 +46,14 @@ else:
     clusterings = uncollapsed_clusterings
     # clusterings = {n: c for (n, c) in uncollapsed_clusterings.items() if int(n[1:]) in [2, 4, 8, 16, 32]}
 
-inter_counts = {c: [] for c in clusterings.keys()}
-intra_counts = {c: [] for c in clusterings.keys()}
-
-for (n, c) in clusterings.items():
-    inter_count = []
-    intra_count = []
-
-    for p in ps:
-        edges = get_remaining_edges(backbone, p)
-        total = len(edges)
-
-        if total == 0:
-            inter_count.append(None)
-            intra_count.append(None)
-        else:
-            inter = 0
-            intra = 0
-
-            for (v, u) in edges:
-                if c.co_clustered(v, u):
-                    intra += 1
-                else:
-                    inter += 1
-
-            inter_count.append(inter / total)
-            intra_count.append(intra / total)
-
-    inter_counts[n] = inter_count
-    intra_counts[n] = intra_count
+intra_fractions = intra_cluster_fractions(backbone, clusterings, ps)
 
 legend = [n[1:] for n in clusterings.keys()]
 
 fig = plt.figure(figsize = (8, 8))
 ax  = plt.subplot(111)
 
-for series in intra_counts.values():
+for series in intra_fractions:
     ax.plot(ps, series)
 
 plt.title("Fraction of intra-cluster edges in backbones extracted from real genetic expression data vs $p$-value")
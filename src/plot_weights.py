@@ -10,7 +10,7 @@ from scipy.optimize import curve_fit
 from scipy.optimize.minpack import leastsq
 import scipy.stats
 
-from backbones import DisparityBackboneStrategy
+from backbones import DisparityBackboneStrategy, score_index
 from backbones.backbone import BackboneStrategy
 from common.progress_bar import print_progress_bar
 from data      import GeneticDataProvider, RandomGeneticDataProvider, MiscDataProvider
@@ -41,7 +41,7 @@ def get_random_backbone(strategy: BackboneStrategy) -> nx.Graph:
 random_graph  = get_random_backbone(backbone_strategy)
 
 def plot_weights(graph, name: str, p = 0.1):
-    weights = [ graph[u][v]["weight"] for (u, v) in graph.edges if graph[u][v]["p"] < p]
+    weights = score_index(graph).weights_below(p)
 
     plot.hist(weights, 100)
     plot.title(name)
@@ -1,25 +1,18 @@
-from typing import List, Tuple
-from statistics import mean
-
 import numpy             as np
-import networkx          as nx
 import matplotlib.pyplot as plt
 
 from backbones import DisparityBackboneStrategy
-from data      import get_multiple_clusterings_from_csv, GeneticDataProvider
+from data      import get_clustering_set_from_csv, GeneticDataProvider
 from common    import print_progress_bar
+from analysis  import intra_cluster_fractions, RunningStatistics
 
-def get_remaining_edges(graph: nx.Graph, p: float = 0.1, attribute: str = "p") -> List[Tuple]:
-    remaining_edges = []
-
-    for (u, v) in graph.edges:
-        if graph[u][v][attribute] < p:
-            remaining_edges.append((u, v))
-
-    return remaining_edges
+ps           = np.linspace(0, 0.5, 100)
+cluster_cols = [f"n{n}" for n in range(2, 33)]
 
-ps = np.linspace(0, 0.5, 100)
-intra_counts = {(f"n{c}", i): [] for c in range(2, 33) for i, _ in enumerate(ps)}
+# Each sample is its own pair of files rather than a graph generated from a
+# seed, so the samples are read in turn rather than by a NullModelEnsemble,
+# but their fractions are still streamed into running statistics.
+statistics = None
 
 for sample_num in range(1, 101):
     print_progress_bar("Sample", sample_num, 100)
@@ -27,40 +20,28 @@ for sample_num in range(1, 101):
     cluster_filename_base = f"./resources/plant_genetics/random_2021-09-27/random_data_with_clusters_{sample_num}.csv"
 
     data_provider = GeneticDataProvider(matrix_filename_base)
-    clusterings   = get_multiple_clusterings_from_csv(cluster_filename_base,
+    clusterings   = get_clustering_set_from_csv(cluster_filename_base,
             vertex_col  = "id",
-            cluster_cols = [f"n{n}" for n in range(2,33)]
+            cluster_cols = cluster_cols
     )
 
     backbone_strategy = DisparityBackboneStrategy()
 
-    backbone    = backbone_strategy.extract_backbone(data_provider.get_graph())
+    backbone    = data_provider.get_backbone_result(backbone_strategy)
     # clusterings = {n: c for (n, c) in clusterings.items() if int(n[1:]) in [2, 4, 8, 16, 32]}
 
-    for (n, c) in clusterings.items():
-        for (i, p) in enumerate(ps):
-            edges = get_remaining_edges(backbone, p)
-            total = len(edges)
-
-            if total != 0:
-                intra = 0
-
-                for (v, u) in edges:
-                    if c.co_clustered(v, u):
-                        intra += 1
+    fractions = intra_cluster_fractions(backbone, clusterings, ps)
 
-                intra_counts[(n, i)].append(intra / total)
+    if statistics is None:
+        statistics = RunningStatistics(fractions.size)
 
-series = {c: [] for c in range(2, 33)}
+    statistics.add(fractions.ravel())
 
-for c in range(2, 33):
-    for i, _ in enumerate(ps):
-        if len(intra_counts[(f"n{c}", i)]) == 0:
-            series[c].append(None)
-        else:
-            series[c].append(mean(intra_counts[(f"n{c}", i)]))
+# One row of fractions per clustering in the set, in the same order.
+mean_fractions = statistics.mean().reshape(clusterings.get_num_clusterings(), len(ps))
+series         = {name: mean_fractions[i] for (i, name) in enumerate(clusterings.names)}
 
-legend = [n[1:] for n in clusterings.keys()]
+legend = [n[1:] for n in clusterings.names]
 
 fig = plt.figure(figsize = (8, 8))
 ax  = plt.subplot(111)
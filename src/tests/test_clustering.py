@@ -0,0 +1,26 @@
+import networkx as nx
+import numpy    as np
+
+from analysis import intra_cluster_fractions
+from common import Clustering
+
+def scored_path() -> nx.Graph:
+    graph = nx.path_graph(4)
+
+    for (i, (_, _, attributes)) in enumerate(graph.edges(data = True)):
+        attributes["weight"] = 1.0
+        attributes["p"]      = 0.1 * (i + 1)
+
+    return graph
+
+def test_intra_cluster_fractions():
+    clustering = Clustering({"a": [0, 1], "b": [2, 3]})
+    fractions  = intra_cluster_fractions(scored_path(), [clustering], [0.15, 0.25, 0.35])
+
+    assert np.allclose(fractions, [[1, 0.5, 2 / 3]])
+
+def test_intra_cluster_fractions_without_clusterings():
+    ps = [0.15, 0.25, 0.35]
+
+    for clusterings in ([], {}):
+        assert intra_cluster_fractions(scored_path(), clusterings, ps).shape == (0, len(ps))
@@ -0,0 +1,27 @@
+import networkx as nx
+
+from common import strength, degree, incoming_strength, outgoing_strength, invalidate_graph
+
+def test_directed_strengths():
+    graph = nx.DiGraph()
+    graph.add_weighted_edges_from([(0, 1, 2), (1, 0, 3), (2, 0, 5), (0, 0, 7)])
+
+    assert incoming_strength(graph, 0) == 15
+    assert outgoing_strength(graph, 0) == 9
+    assert strength(graph, 0) == 9
+    assert degree(graph, 0) == 2
+    assert isinstance(strength(graph, 0), int)
+
+def test_strengths_follow_invalidated_graph():
+    graph = nx.Graph()
+    graph.add_weighted_edges_from([(0, 1, 1.5), (1, 2, 2.5)])
+
+    assert strength(graph, 1) == 4.0
+
+    graph[0][1]["weight"] = 10.0
+    invalidate_graph(graph)
+    assert strength(graph, 1) == 12.5
+
+    graph.add_edge(1, 3, weight = 1.0)
+    assert strength(graph, 1) == 13.5
+    assert degree(graph, 1) == 3
@@ -0,0 +1,30 @@
+import pytest
+
+from backbones import (
+    CompositeBackboneStrategy,
+    DisparityBackboneStrategy,
+    HighSalienceSkeletonBackboneStrategy,
+    NoiseCorrectedBackboneStrategy
+)
+
+def test_secondary_attributes_may_not_collide():
+    with pytest.raises(ValueError, match = "salience_stderr"):
+        CompositeBackboneStrategy([
+            HighSalienceSkeletonBackboneStrategy(sample_size = 4),
+            DisparityBackboneStrategy(attribute = "salience_stderr")
+        ])
+
+    with pytest.raises(ValueError, match = "delta"):
+        CompositeBackboneStrategy([
+            NoiseCorrectedBackboneStrategy(),
+            NoiseCorrectedBackboneStrategy(attribute = "p_nc_2")
+        ])
+
+def test_distinct_attributes_are_accepted():
+    composite = CompositeBackboneStrategy([
+        DisparityBackboneStrategy(),
+        NoiseCorrectedBackboneStrategy(),
+        HighSalienceSkeletonBackboneStrategy(sample_size = 4)
+    ])
+
+    assert composite.score_attributes() == ["p", "p_nc", "delta", "salience", "salience_stderr"]
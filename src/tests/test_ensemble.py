@@ -0,0 +1,30 @@
+import networkx as nx
+import numpy    as np
+
+from analysis import NullModelEnsemble, ThresholdSweep
+from backbones import HighSalienceSkeletonBackboneStrategy, PolyaBackboneStrategy
+
+def random_weighted_graph(n: int, seed: int) -> nx.Graph:
+    graph = nx.gnm_random_graph(n, 4 * n, seed = seed)
+    rng   = np.random.default_rng(seed)
+
+    for (_, _, attributes) in graph.edges(data = True):
+        attributes["weight"] = int(rng.integers(1, 10))
+
+    return graph
+
+def test_ensemble_sweeps_the_strategy_attribute():
+    ps = [0.1, 0.5, 0.9]
+
+    for strategy in (HighSalienceSkeletonBackboneStrategy(), PolyaBackboneStrategy(a = 1)):
+        ensemble = NullModelEnsemble(
+            strategy, ps, n = 20, measures = ["size"], graph_factory = random_weighted_graph, seed = 0)
+
+        assert ensemble.attribute == strategy.attribute
+
+        summary = ensemble.run(3)
+        seeds   = ensemble._seeds(3)
+        results = [strategy.extract_backbone_result(random_weighted_graph(20, s)) for s in seeds]
+        sizes   = [ThresholdSweep(result, ps, strategy.attribute).size() for result in results]
+
+        assert np.allclose(summary.mean("size"), np.mean(sizes, axis = 0))
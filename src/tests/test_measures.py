@@ -0,0 +1,40 @@
+import networkx as nx
+
+from analysis import MeasureCache, size, degree_sequence
+from backbones import DisparityBackboneStrategy
+
+def scored_graph() -> nx.Graph:
+    graph = nx.gnm_random_graph(60, 300, seed = 1)
+
+    for (i, (_, _, attributes)) in enumerate(graph.edges(data = True)):
+        attributes["weight"] = float(1 + i % 7)
+
+    DisparityBackboneStrategy().extract_backbone(graph)
+    return graph
+
+def test_measures_follow_rescored_graph():
+    graph = scored_graph()
+    cache = MeasureCache()
+    ps    = [0.05, 0.2, 0.5]
+
+    before = cache.measure(size, graph, ps)
+
+    # Re-extracting in place keeps the graph's shape but changes its scores.
+    for (i, (_, _, attributes)) in enumerate(graph.edges(data = True)):
+        attributes["weight"] = float(1 + (i * i) % 50)
+
+    DisparityBackboneStrategy().extract_backbone(graph)
+
+    after = cache.measure(size, graph, ps)
+
+    assert after == [size(graph, p) for p in ps]
+    assert after != before
+
+def test_cached_values_are_immutable():
+    graph = scored_graph()
+    cache = MeasureCache()
+
+    sequence = cache.measure(degree_sequence, graph, [0.5])[0]
+
+    assert isinstance(sequence, tuple)
+    assert cache.measure(degree_sequence, graph, [0.5])[0] == tuple(degree_sequence(graph, 0.5))
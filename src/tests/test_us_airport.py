@@ -0,0 +1,26 @@
+import networkx as nx
+import numpy    as np
+import pandas   as pd
+
+from data.us_airport import construct_us_airport_network, stream_us_airport_network
+
+def test_stream_skips_null_airport_codes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "resources").mkdir()
+
+    dataset = pd.DataFrame({
+        "PASSENGERS": [10.0, 5.0, 0.0, 7.0, np.nan, 3.0],
+        "ORIGIN":     ["AAA", "BBB", "AAA", "CCC", "AAA", "DDD"],
+        "DEST":       ["BBB", "AAA", "CCC", "AAA", "CCC", "AAA"],
+        "MONTH":      [1, 2, 3, 4, 5, 6]
+    })
+    dataset.to_csv(tmp_path / "resources" / "us_airport_2000.csv", index = False)
+
+    # A blank code in the locations file is read as NaN.
+    locations = {"AAA": (0.0, 0.0), np.nan: (1.0, 1.0), "BBB": (2.0, 2.0), "CCC": (3.0, 3.0)}
+
+    streamed = stream_us_airport_network(2000, 2, locations = locations)
+    expected = construct_us_airport_network(dataset.fillna({"PASSENGERS": 0}), None, locations)
+
+    assert nx.utils.edges_equal(streamed.edges(data = "weight"), expected.edges(data = "weight"))
+    assert dict(streamed.edges[("AAA", "BBB")]) == {"weight": 15.0}
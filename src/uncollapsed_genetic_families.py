@@ -1,4 +1,4 @@
-from backbones import DisparityBackboneStrategy
+from backbones import DisparityBackboneStrategy, score_index
 from data      import get_clusters_from_csv, GeneticDataProvider
 from plot      import PlotBuilder, RadialVisualisation
 
@@ -31,7 +31,7 @@ def update_p_textbox(p_str: str) -> None:
 
     corrected_p_val = backbone_strategy.correct_p_value(graph, p_val)
 
-    edges = [(v, u) for (v, u) in graph.edges if graph[v][u]["p"] < corrected_p_val]
+    edges = score_index(graph).edges_below(corrected_p_val)
     visualisation.set_edges_to_display(edges)
 
     plot_builder.redraw()
@@ -10,7 +10,7 @@ backbone_strategy = PolyaBackboneStrategy(a = 1, integer_weights = False)
 visualisation     = MapVisualisation(data_provider, backbone_strategy)
 plot_builder      = PlotBuilder(visualisation)
 
-edges = [(v, u) for (v, u) in data_provider.graph.edges if data_provider.graph[v][u]["p"] < 0.003]
+edges = [(v, u) for (v, u) in data_provider.graph.edges if data_provider.graph[v][u][backbone_strategy.attribute] < 0.003]
 visualisation.set_edges_to_display(edges)
 
 plot_builder.fig.set_size_inches(12, 8, forward = True)
@@ -11,15 +11,15 @@ backbone_strategy = PolyaBackboneStrategy(a = 1, integer_weights = False)
 data_provider.apply_backbone_strategy(backbone_strategy)
 backbone = data_provider.get_graph()
 
-ps = p_values(backbone)
+ps = p_values(backbone, backbone_strategy.attribute)
 
 interesting_values = [1, 0.0005, 0.003, 0.05, 0.3, 0.5]
 orders = []
 sizes  = []
 
 for i in interesting_values:
-    orders.append(order(backbone, p = i))
-    sizes.append(size(backbone, p = i))
+    orders.append(order(backbone, p = i, attribute = backbone_strategy.attribute))
+    sizes.append(size(backbone, p = i, attribute = backbone_strategy.attribute))
 
     print(f"Order of backbone with salience = {i}: {orders[-1]}")
     print(f"Size of backbone with salience = {i}: {sizes[-1]}")